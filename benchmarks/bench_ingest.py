@@ -0,0 +1,74 @@
+"""Сравнение движков чтения выгрузки "Отчет по операциям".
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_ingest --scale 10 --repeat 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+
+import pandas as pd
+
+from src.ingest import SHEET_NAME, available_engines, read_operations
+from src.utils import PATH_TO_EXCEL
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Возвращает лучшее время выполнения функции из нескольких запусков."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def make_scaled_files(df: pd.DataFrame, scale: int, directory: str) -> dict[str, str]:
+    """Сохраняет увеличенную в scale раз копию выгрузки в форматах xlsx, csv и parquet."""
+    scaled = pd.concat([df] * scale, ignore_index=True)
+    paths = {
+        "xlsx": os.path.join(directory, f"operations_x{scale}.xlsx"),
+        "csv": os.path.join(directory, f"operations_x{scale}.csv"),
+    }
+    scaled.to_excel(paths["xlsx"], sheet_name=SHEET_NAME, index=False)
+    scaled.to_csv(paths["csv"], index=False)
+    if "parquet" in available_engines():
+        paths["parquet"] = os.path.join(directory, f"operations_x{scale}.parquet")
+        scaled.to_parquet(paths["parquet"], index=False)
+    return paths
+
+
+def run_benchmark(path: str, label: str, repeat: int, columns: list[str]) -> None:
+    extension = os.path.splitext(path)[1].lower()
+    engines = ["csv"] if extension == ".csv" else ["parquet"] if extension == ".parquet" else [
+        engine for engine in ("openpyxl", "calamine", "xml") if engine in available_engines()
+    ]
+    rows = len(read_operations(path, engine=engines[0]))
+    print(f"\n{label}: {os.path.basename(path)} ({rows} строк)")
+    for engine in engines:
+        full = best_time(lambda: read_operations(path, engine=engine), repeat)
+        projected = best_time(lambda: read_operations(path, engine=engine, columns=columns), repeat)
+        print(f"  {engine:<10} все столбцы: {full:8.3f} с   {len(columns)} столбца: {projected:8.3f} с")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение движков чтения выгрузки операций")
+    parser.add_argument("--scale", type=int, default=10, help="Во сколько раз увеличить синтетическую выгрузку")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество повторов каждого замера")
+    args = parser.parse_args()
+
+    columns = ["Дата операции", "Сумма платежа", "Категория", "Сумма операции с округлением"]
+    print(f"Доступные движки: {', '.join(available_engines())}")
+    run_benchmark(PATH_TO_EXCEL, "Исходный файл", args.repeat, columns)
+
+    df = read_operations(PATH_TO_EXCEL)
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt, path in make_scaled_files(df, args.scale, directory).items():
+            run_benchmark(path, f"Синтетический файл x{args.scale} ({fmt})", args.repeat, columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Сравнение SQL-бэкенда (SQLite) с расчётами pandas на одних и тех же запросах.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_sql --scale 50 --repeat 5
+"""
+
+import argparse
+import os
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.bench_ingest import best_time
+from src.reports import SPENDING_BY_CATEGORY_COLUMNS, spending_by_category
+from src.services import HIGH_CASHBACK_COLUMNS, get_high_cashback_categories
+from src.sql_backend import (
+    build_database,
+    high_cashback_categories_sql,
+    spending_by_category_sql,
+    summary_card_data_sql,
+)
+from src.utils import SUMMARY_CARD_COLUMNS, get_summary_card_data, read_data_file
+
+
+def scale_operations(df: pd.DataFrame, scale: int) -> pd.DataFrame:
+    """Увеличивает выгрузку в scale раз, сдвигая каждую копию на год назад, чтобы росла и история."""
+    dates = pd.to_datetime(df["Дата операции"], dayfirst=True)
+    copies = [df.assign(**{"Дата операции": dates - pd.DateOffset(years=shift)}) for shift in range(scale)]
+    return pd.concat(copies, ignore_index=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение SQL-бэкенда и pandas")
+    parser.add_argument("--scale", type=int, default=50, help="Во сколько раз увеличить выгрузку")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов каждого замера")
+    args = parser.parse_args()
+
+    columns = list(dict.fromkeys(["Номер карты", "Статус"] + SPENDING_BY_CATEGORY_COLUMNS + HIGH_CASHBACK_COLUMNS
+                                 + SUMMARY_CARD_COLUMNS))
+    df = scale_operations(read_data_file(columns=columns), args.scale)
+    report_date = datetime(2021, 4, 10, 20, 30)
+    month_start = report_date.replace(day=1, hour=0, minute=0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "operations.sqlite")
+        build_time = best_time(lambda: build_database(df, db_path), 1)
+        print(f"Строк: {len(df)}, построение базы: {build_time:.3f} с")
+
+        def pandas_summary() -> list[dict]:
+            return get_summary_card_data(df[df["Дата операции"].between(month_start, report_date)])
+
+        cases = [
+            (
+                "spending_by_category",
+                lambda: spending_by_category(df.copy(), "Супермаркеты", report_date),
+                lambda: spending_by_category_sql("Супермаркеты", report_date, db_path),
+            ),
+            (
+                "get_high_cashback_categories",
+                lambda: get_high_cashback_categories(df.copy(), "2021", "04"),
+                lambda: high_cashback_categories_sql("2021", "04", db_path),
+            ),
+            (
+                "get_summary_card_data",
+                pandas_summary,
+                lambda: summary_card_data_sql(month_start, report_date, db_path),
+            ),
+        ]
+        print(f"{'запрос':<30}{'pandas, с':>12}{'SQLite, с':>12}{'ускорение':>12}")
+        for name, pandas_func, sql_func in cases:
+            pandas_time = best_time(pandas_func, args.repeat)
+            sql_time = best_time(sql_func, args.repeat)
+            print(f"{name:<30}{pandas_time:>12.4f}{sql_time:>12.4f}{pandas_time / sql_time:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
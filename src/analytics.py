@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля analytics."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "analytics.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+DEFAULT_GROUP_COLUMNS = ("Категория", "Номер карты")
+
+# Столбцы, которые читают функции построения рядов расходов
+SPENDING_SERIES_COLUMNS = [
+    "Дата операции",
+    "Номер карты",
+    "Сумма платежа",
+    "Категория",
+    "Сумма операции с округлением",
+]
+DEFAULT_WINDOWS = (7, 30, 90)
+
+# Соответствие коротких обозначений периодичности правилам pandas.resample
+FREQ_ALIASES = {"D": "D", "W": "W", "M": "MS"}
+
+
+def daily_spending_matrix(df: pd.DataFrame, by: Sequence[str] = DEFAULT_GROUP_COLUMNS) -> pd.DataFrame:
+    """ Строит плотную матрицу ежедневных расходов: строки — календарные дни, столбцы — группы.
+    Args: df (pandas.DataFrame): DataFrame с транзакциями.
+          by (Sequence[str]): Столбцы, задающие группу (по умолчанию категория и карта).
+    Returns: pandas.DataFrame: Суммы расходов за каждый день всей истории по каждой группе."""
+
+    if df.empty:
+        return pd.DataFrame()
+
+    spent_df = df[df["Сумма платежа"] < 0]
+    dates = pd.to_datetime(spent_df["Дата операции"], dayfirst=True, errors="coerce").dt.normalize()
+    valid = dates.notna().to_numpy()
+    if not valid.any():
+        logger.info("Нет расходов с корректной датой операции.")
+        return pd.DataFrame()
+
+    dates = dates[valid]
+    keys = spent_df.loc[valid, list(by)].copy()
+    if "Номер карты" in keys.columns:
+        keys["Номер карты"] = keys["Номер карты"].fillna("Карта не указана")
+    keys = keys.fillna("Не указано")
+    # Пропущенные суммы не учитываются, как в groupby().sum(); иначе NaN испортил бы префиксные суммы rolling_spending
+    amounts = np.nan_to_num(spent_df.loc[valid, "Сумма операции с округлением"].abs().to_numpy(dtype=float))
+
+    group_codes, groups = pd.MultiIndex.from_frame(keys).factorize(sort=True)
+    first_day = dates.min()
+    day_index = ((dates - first_day).dt.days).to_numpy()
+    n_days = int(day_index.max()) + 1
+    n_groups = len(groups)
+
+    # Один проход bincount вместо groupby по каждой паре (день, группа)
+    flat = np.bincount(day_index * n_groups + group_codes, weights=amounts, minlength=n_days * n_groups)
+    matrix = pd.DataFrame(
+        flat.reshape(n_days, n_groups),
+        index=pd.date_range(first_day, periods=n_days, freq="D", name="Дата операции"),
+        columns=groups.set_names(list(by)),
+    )
+    logger.debug(f"Построена матрица расходов: {n_days} дней x {n_groups} групп.")
+    return matrix
+
+
+def resample_spending(matrix: pd.DataFrame, freq: str = "D") -> pd.DataFrame:
+    """ Агрегирует ежедневную матрицу расходов до недель или месяцев.
+    Args: matrix (pandas.DataFrame): Результат daily_spending_matrix.
+          freq (str): Периодичность: "D" — дни, "W" — недели, "M" — месяцы.
+    Returns: pandas.DataFrame: Суммы расходов по периодам."""
+
+    if freq not in FREQ_ALIASES:
+        raise ValueError(f"Неизвестная периодичность: {freq}. Допустимые значения: {', '.join(FREQ_ALIASES)}")
+    if matrix.empty or freq == "D":
+        return matrix
+    return matrix.resample(FREQ_ALIASES[freq]).sum()
+
+
+def rolling_spending(
+        matrix: pd.DataFrame,
+        windows: Sequence[int] = DEFAULT_WINDOWS
+) -> dict[str, pd.DataFrame]:
+    """ Считает скользящие суммы и средние по ежедневной матрице расходов через префиксные суммы.
+    Args: matrix (pandas.DataFrame): Результат daily_spending_matrix.
+          windows (Sequence[int]): Размеры окон в днях.
+    Returns: dict: Ключи вида "sum_7d" и "mean_7d", значения — матрицы той же формы, что и matrix."""
+
+    result: dict[str, pd.DataFrame] = {}
+    if matrix.empty:
+        return result
+
+    values = matrix.to_numpy()
+    n_days = values.shape[0]
+    prefix = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+    ends = np.arange(1, n_days + 1)
+
+    for window in windows:
+        if window < 1:
+            raise ValueError(f"Размер окна должен быть положительным: {window}")
+        starts = np.maximum(ends - window, 0)
+        sums = prefix[ends] - prefix[starts]
+        # В начале истории окно неполное — среднее считаем по фактическому числу дней
+        counts = (ends - starts).reshape(-1, 1)
+        result[f"sum_{window}d"] = pd.DataFrame(sums, index=matrix.index, columns=matrix.columns)
+        result[f"mean_{window}d"] = pd.DataFrame(sums / counts, index=matrix.index, columns=matrix.columns)
+
+    logger.debug(f"Рассчитаны скользящие показатели для окон {list(windows)}.")
+    return result
+
+
+def spending_series(
+        df: pd.DataFrame,
+        category: Optional[str] = None,
+        card: Optional[str] = None,
+        freq: str = "D",
+        start_date: Optional[Union[str, datetime]] = None,
+        end_date: Optional[Union[str, datetime]] = None,
+        windows: Sequence[int] = DEFAULT_WINDOWS
+) -> str:
+    """ Возвращает JSON с временным рядом расходов по категории и/или карте.
+    Args: df (pandas.DataFrame): DataFrame с транзакциями.
+          category (str): Категория (по умолчанию все категории).
+          card (str): Номер карты, например "*7197" (по умолчанию все карты).
+          freq (str): Периодичность ряда: "D", "W" или "M".
+          start_date, end_date: Границы выдачи в формате 'ДД.ММ.ГГГГ' или datetime.
+          windows (Sequence[int]): Окна скользящих сумм и средних (только для freq="D").
+    Returns: str: JSON-строка с рядом расходов."""
+
+    logger.debug("Запуск функции spending_series")
+    try:
+        start_dt = datetime.strptime(start_date, "%d.%m.%Y") if isinstance(start_date, str) else start_date
+        end_dt = datetime.strptime(end_date, "%d.%m.%Y") if isinstance(end_date, str) else end_date
+
+        matrix = daily_spending_matrix(df)
+        if not matrix.empty:
+            mask = np.ones(len(matrix.columns), dtype=bool)
+            if category is not None:
+                mask &= matrix.columns.get_level_values("Категория") == category
+            if card is not None:
+                mask &= matrix.columns.get_level_values("Номер карты") == card
+            matrix = matrix.loc[:, mask]
+
+        if matrix.empty:
+            logger.info(f"Нет расходов для категории '{category}' и карты '{card}'.")
+            return json.dumps({"series": []}, ensure_ascii=False, indent=4)
+
+        total = matrix.sum(axis=1).to_frame("total")
+        frames = [resample_spending(total, freq)]
+        if freq == "D":
+            rolling = rolling_spending(total, windows)
+            frames.extend(frame.rename(columns={"total": name}) for name, frame in rolling.items())
+        series_df = pd.concat(frames, axis=1)
+        series_df = series_df.loc[start_dt:end_dt].round(2)
+
+        series_df.index = series_df.index.strftime("%Y-%m-%d")
+        result = series_df.reset_index(names="date").to_dict(orient="records")
+        logger.info(f"Сформирован ряд расходов из {len(result)} точек (периодичность {freq}).")
+        return json.dumps({"freq": freq, "series": result}, ensure_ascii=False, indent=4)
+
+    except Exception as e:
+        logger.error(f"Ошибка в функции spending_series: {e}")
+        return json.dumps({"error": str(e)}, ensure_ascii=False, indent=4)
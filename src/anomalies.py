@@ -0,0 +1,171 @@
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.cards import NO_CARD
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля anomalies."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "anomalies.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+# Столбцы, которые читает поиск аномалий
+ANOMALY_COLUMNS = [
+    "Дата операции",
+    "Номер карты",
+    "Статус",
+    "Сумма платежа",
+    "Категория",
+    "Описание",
+    "Сумма операции с округлением",
+]
+
+# Коэффициент, при котором MAD нормального распределения совпадает со стандартным отклонением
+MAD_SCALE = 0.6745
+
+
+def _robust_zscore(amounts: pd.Series, groups: pd.Series) -> pd.Series:
+    """Робастный z-score суммы относительно медианы и MAD своей группы."""
+    median = amounts.groupby(groups, sort=False).transform("median")
+    deviation = (amounts - median).abs()
+    mad = deviation.groupby(groups, sort=False).transform("median")
+    return MAD_SCALE * (amounts - median) / mad.replace(0, np.nan)
+
+
+def _rolling_median(amounts: pd.Series, groups: pd.Series, window: int, min_history: int) -> pd.Series:
+    """Медиана предыдущих window операций группы (текущая операция в окно не входит)."""
+    previous = amounts.groupby(groups, sort=False).shift(1)
+    rolling = previous.groupby(groups, sort=False).rolling(window, min_periods=min_history).median()
+    return rolling.droplevel(0).reindex(amounts.index)
+
+
+def _burst_mask(card_codes: np.ndarray, seconds: np.ndarray, window_seconds: int, burst_count: int) -> np.ndarray:
+    """ Отмечает операции, входящие в серию из burst_count и более операций по одной карте за window_seconds.
+    Массивы должны быть отсортированы по карте, затем по времени."""
+
+    # Сдвигаем время каждой карты на непересекающийся интервал, чтобы один searchsorted обработал все карты
+    span = int(seconds.max() - seconds.min()) + window_seconds + 1
+    keys = card_codes.astype(np.int64) * span + (seconds - seconds.min())
+    starts = np.searchsorted(keys, keys - window_seconds, side="left")
+    positions = np.arange(len(keys))
+    completes = np.flatnonzero(positions - starts + 1 >= burst_count)
+
+    # Отмечаем все операции окна, в котором набралась серия
+    marks = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.add.at(marks, starts[completes], 1)
+    np.add.at(marks, completes + 1, -1)
+    return np.cumsum(marks[:-1]) > 0
+
+
+def detect_anomalies(
+        df: pd.DataFrame,
+        z_threshold: float = 3.5,
+        window: int = 30,
+        factor: float = 3.0,
+        min_history: int = 5,
+        burst_window: str = "10min",
+        burst_count: int = 5,
+        limit: Optional[int] = None,
+        since: Optional[datetime] = None
+) -> list[dict]:
+    """ Находит необычные расходные операции по каждой паре карта/категория.
+    Args: df (pandas.DataFrame): DataFrame с транзакциями.
+          z_threshold (float): Порог робастного z-score (медиана и MAD группы).
+          window (int): Число предыдущих операций группы для скользящей медианы.
+          factor (float): Во сколько раз сумма должна превысить скользящую медиану.
+          min_history (int): Минимум операций в группе, чтобы судить об отклонении.
+          burst_window (str): Окно для поиска серий операций по карте, например "10min".
+          burst_count (int): Сколько операций в окне считается серией.
+          limit (int): Максимальное число операций в ответе (None — без ограничения).
+          since (datetime): Операции до этой даты служат только историей для сравнения и в ответ не попадают.
+    Returns: list[dict]: Операции с причинами, по которым они отмечены, от новых к старым."""
+
+    if df.empty:
+        print("Ошибка. Данные для анализа не обнаружены.")
+        return []
+
+    spent_df = df[df["Сумма платежа"] < 0]
+    if "Статус" in spent_df.columns:
+        spent_df = spent_df[spent_df["Статус"] == "OK"]
+    spent_df = spent_df.reset_index(drop=True)
+    work = pd.DataFrame(
+        {
+            "date": pd.to_datetime(spent_df["Дата операции"], dayfirst=True, errors="coerce"),
+            "card": spent_df["Номер карты"].fillna(NO_CARD),
+            "category": spent_df["Категория"].fillna("Не указано"),
+            "amount": spent_df["Сумма операции с округлением"].abs().astype(float),
+        }
+    ).dropna(subset=["date"])
+    if work.empty:
+        return []
+
+    # Группы карта/категория кодируются одним целым числом, чтобы не хешировать строки при каждой группировке
+    work["card_code"] = pd.factorize(work["card"])[0]
+    category_codes, categories = pd.factorize(work["category"])
+    work["group_code"] = work["card_code"] * len(categories) + category_codes
+    work = work.sort_values(["card_code", "date"], kind="stable")
+    groups = work["group_code"]
+
+    group_size = work.groupby(groups, sort=False)["amount"].transform("size")
+    zscore = _robust_zscore(work["amount"], groups)
+    rolling_median = _rolling_median(work["amount"], groups, window, min_history)
+    seconds = work["date"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    window_seconds = int(pd.Timedelta(burst_window).total_seconds())
+
+    reasons = pd.DataFrame(
+        {
+            "robust_zscore": (zscore > z_threshold) & (group_size >= min_history),
+            "rolling_median": work["amount"] > factor * rolling_median,
+            "burst": _burst_mask(work["card_code"].to_numpy(), seconds, window_seconds, burst_count),
+        },
+        index=work.index,
+    )
+    flagged = reasons[reasons.any(axis=1)]
+    if since is not None:
+        flagged = flagged[work.loc[flagged.index, "date"] >= pd.Timestamp(since)]
+    logger.debug(f"Проверено операций: {len(work)}, отмечено: {len(flagged)}.")
+
+    flagged_rows = work.loc[flagged.index].sort_values("date", ascending=False, kind="stable")
+    if limit is not None:
+        flagged_rows = flagged_rows.head(limit)
+
+    descriptions = spent_df["Описание"] if "Описание" in spent_df.columns else pd.Series(None, index=spent_df.index)
+    descriptions = descriptions.astype(object).where(descriptions.notna(), None)
+
+    result = []
+    for index, row in flagged_rows.iterrows():
+        result.append(
+            {
+                "date": row["date"].strftime("%d.%m.%Y"),
+                "amount": round(row["amount"], 2),
+                "category": row["category"],
+                "description": descriptions[index],
+                "card": row["card"],
+                "reasons": [reason for reason in reasons.columns if flagged.at[index, reason]],
+                "zscore": None if pd.isna(zscore[index]) else round(float(zscore[index]), 2),
+            }
+        )
+    logger.info(f"Найдено необычных операций: {len(flagged)}.")
+    return result
@@ -0,0 +1,230 @@
+import asyncio
+import functools
+import importlib.util
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Union
+
+import pandas as pd
+import requests
+
+from src.anomalies import detect_anomalies
+from src.reports import spending_by_category
+from src.services import get_high_cashback_categories
+from src.utils import (
+    CURRENCIES_URL,
+    STOCKS_URL,
+    currencies_request,
+    get_date_range,
+    get_slice_of_data,
+    get_summary_card_data,
+    get_time_for_greeting,
+    parse_currency_rates,
+    parse_stock_prices,
+    read_user_settings,
+    stocks_request,
+    top_5_transactions_by_sum,
+)
+from src.views import ANOMALIES_LIMIT, MAIN_INFO_COLUMNS, anomaly_history_start, check_date_time, select_period
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля async_api."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "async_api.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+# Сколько этапов pandas выполняется одновременно; остальные ждут в очереди и отменяются вместе с запросом
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+HTTP_TIMEOUT = 30
+
+# aiohttp — необязательная зависимость: без неё запросы выполняются через requests в отдельном потоке
+HAS_AIOHTTP = importlib.util.find_spec("aiohttp") is not None
+
+
+class StageExecutor:
+    """ Пул потоков для тяжёлых этапов (чтение выгрузки, pandas) с ограниченным числом рабочих потоков.
+    Запросы котировок в этот пул не попадают. Исключение — догрузка курсов для пересчёта выгрузки
+    (currency.fetch_rates): она выполняется внутри этапа чтения, если таблица курсов не покрывает период,
+    и повторяется только для новой версии выгрузки."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage")
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """ Выполняет функцию в пуле, не блокируя цикл событий.
+        При отмене ожидающей задачи этап, ещё не начавший выполняться, снимается с очереди;
+        уже запущенный этап доработает, но его результат будет отброшен."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        """Останавливает пул, отменяя этапы в очереди."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_default_executor: Optional[StageExecutor] = None
+
+
+def get_executor() -> StageExecutor:
+    """Возвращает общий пул этапов, создавая его при первом обращении."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = StageExecutor()
+    return _default_executor
+
+
+async def fetch_json(url: str, params: dict, headers: dict, session: Any = None) -> Optional[dict]:
+    """ Выполняет GET-запрос без блокировки цикла событий.
+    Args: url (str): Адрес API.
+          params (dict): Параметры запроса.
+          headers (dict): Заголовки запроса.
+          session (aiohttp.ClientSession): Открытая сессия aiohttp (по умолчанию создаётся на один запрос).
+    Returns: dict | None: Ответ API или None, если запрос не удался."""
+
+    if HAS_AIOHTTP:
+        import aiohttp
+
+        # aiohttp не принимает None в параметрах и заголовках
+        params = {key: value for key, value in params.items() if value is not None}
+        headers = {key: value for key, value in headers.items() if value is not None}
+        own_session = session is None
+        if own_session:
+            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT))
+        try:
+            async with session.get(url, params=params, headers=headers) as response:
+                if response.status != 200:
+                    logger.error(f"Запрос {url} завершился с кодом {response.status}: {response.reason}.")
+                    return None
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Не удалось выполнить запрос {url}: {e}")
+            return None
+        finally:
+            if own_session:
+                await session.close()
+
+    try:
+        response = await asyncio.to_thread(requests.get, url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        logger.error(f"Не удалось выполнить запрос {url}: {e}")
+        return None
+    if response.status_code != 200:
+        logger.error(f"Запрос {url} завершился с кодом {response.status_code}: {response.reason}.")
+        return None
+    return response.json()
+
+
+async def actual_currencies_async(base_currency: str = "RUB", session: Any = None) -> list[dict]:
+    """Асинхронный вариант utils.actual_currencies."""
+    currencies = read_user_settings("user_currencies")
+    if currencies is None:
+        return []
+    payload, headers = currencies_request(currencies, base_currency)
+    response_json = await fetch_json(CURRENCIES_URL, payload, headers, session)
+    if response_json is None:
+        print(f"Неудачная попытка получить курс валют {currencies}.")
+        return []
+    logger.debug(f"Курсы валют {currencies} по API-запросу успешно получены.")
+    return parse_currency_rates(response_json)
+
+
+async def actual_stocks_async(session: Any = None) -> list[dict]:
+    """Асинхронный вариант utils.actual_stocks."""
+    symbols = read_user_settings("user_stocks")
+    if symbols is None:
+        return []
+    payload, headers = stocks_request(symbols)
+    response_json = await fetch_json(STOCKS_URL, payload, headers, session)
+    if response_json is None:
+        print(f"Неудачная попытка получить курсы акций {symbols}.")
+        return []
+    logger.debug(f"Курсы акций {symbols} по API-запросу успешно получены.")
+    return parse_stock_prices(response_json)
+
+
+async def main_info_async(
+        date_time: str,
+        executor: Optional[StageExecutor] = None,
+        session: Any = None
+) -> str:
+    """ Асинхронный вариант views.main_info: котировки запрашиваются параллельно с расчётами,
+    расчёты выполняются в пуле этапов (чтение выгрузки может догружать курсы валют, см. StageExecutor).
+    Отмена задачи отменяет запросы котировок и ещё не начатые этапы.
+    Args: date_time (str): Дата и время в формате "YYYY-MM-DD HH:MM:SS".
+          executor (StageExecutor): Пул этапов (по умолчанию общий).
+          session (aiohttp.ClientSession): Сессия для запросов котировок.
+    Returns: str: JSON-строка в формате views.main_info."""
+
+    logger.debug("Запуск функции main_info_async")
+    check_date_time(date_time)
+    executor = executor or get_executor()
+    start_date, end_date = get_date_range(date_time)
+
+    async with asyncio.TaskGroup() as group:
+        currencies = group.create_task(actual_currencies_async(session=session))
+        stocks = group.create_task(actual_stocks_async(session=session))
+
+        history_df = await executor.run(
+            get_slice_of_data, anomaly_history_start(start_date), end_date, columns=MAIN_INFO_COLUMNS
+        )
+        df = select_period(history_df, start_date)
+        logger.info(f"Получено {len(df)} транзакций за период {start_date} — {end_date}")
+        cards = group.create_task(executor.run(get_summary_card_data, df))
+        top_transactions = group.create_task(executor.run(top_5_transactions_by_sum, df))
+        anomalies = group.create_task(
+            executor.run(detect_anomalies, history_df, limit=ANOMALIES_LIMIT, since=start_date)
+        )
+
+    data: Dict[str, object] = {
+        "greeting": get_time_for_greeting(),
+        "cards": cards.result(),
+        "top_transactions": top_transactions.result(),
+        "anomalies": anomalies.result(),
+        "currency_rates": currencies.result(),
+        "stock_prices": stocks.result(),
+    }
+    logger.info("Сформированы все блоки данных для главной страницы")
+    return json.dumps(data, ensure_ascii=False, indent=4)
+
+
+async def spending_by_category_async(
+        transactions: pd.DataFrame,
+        category: str,
+        start_date: Optional[Union[str, datetime]] = None,
+        executor: Optional[StageExecutor] = None
+) -> str:
+    """Асинхронный вариант reports.spending_by_category (расчёт идёт над копией таблицы в пуле этапов)."""
+    # Отчёт преобразует столбец дат на месте — копия не даёт параллельным запросам менять общую таблицу
+    return await (executor or get_executor()).run(spending_by_category, transactions.copy(), category, start_date)
+
+
+async def get_high_cashback_categories_async(
+        df: pd.DataFrame,
+        year: str,
+        month: str,
+        executor: Optional[StageExecutor] = None
+) -> str:
+    """Асинхронный вариант services.get_high_cashback_categories (расчёт идёт над копией таблицы в пуле этапов)."""
+    df = df.copy() if df is not None else df
+    return await (executor or get_executor()).run(get_high_cashback_categories, df, year, month)
@@ -0,0 +1,124 @@
+import logging
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля cards."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "cards.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+NO_CARD = "Карта не указана"
+
+# Стандартный процент кешбэка — единый для сводки по картам и анализа категорий (services, sql_backend)
+STANDARD_CASHBACK_RATE = 0.01  # 1%
+
+# Строки частичной сводки: сумма расходов и число операций по каждому коду карты
+TOTAL_SPENT, OPERATIONS = 0, 1
+
+
+def dimension_from_numbers(numbers: pd.Index) -> pd.DataFrame:
+    """ Строит справочник карт из номеров в заданном порядке: позиция номера становится кодом карты.
+    Используется для восстановления сохранённого справочника, коды которого уже записаны в частичных сводках.
+    Args: numbers (pandas.Index): Номера карт в порядке кодов.
+    Returns: pandas.DataFrame: Справочник в формате build_card_dimension."""
+    return pd.DataFrame(
+        {"Номер карты": numbers, "last_digits": numbers.astype(str).str.replace("*", "", regex=False)},
+        index=pd.RangeIndex(len(numbers), name="card_code"),
+    )
+
+
+def build_card_dimension(cards: pd.Series, dimension: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """ Строит справочник карт: код карты -> номер карты и последние цифры.
+    Args: cards (pandas.Series): Номера карт из выгрузки.
+          dimension (pandas.DataFrame): Существующий справочник — новые карты получают следующие коды.
+    Returns: pandas.DataFrame: Справочник с индексом "card_code" и столбцами "Номер карты", "last_digits"."""
+
+    known = pd.Index([] if dimension is None else dimension["Номер карты"])
+    new_cards = pd.Index(cards.dropna().unique()).difference(known).sort_values()
+    result = dimension_from_numbers(known.append(new_cards))
+    if len(new_cards):
+        logger.debug(f"В справочник карт добавлено {len(new_cards)} карт, всего {len(result)}.")
+    return result
+
+
+def factorize_cards(cards: pd.Series) -> tuple[np.ndarray, pd.DataFrame]:
+    """Кодирует номера карт за один проход и строит по ним справочник; пропуски получают код -1."""
+    codes, numbers = pd.factorize(cards, sort=True)
+    return codes, dimension_from_numbers(pd.Index(numbers))
+
+
+def encode_cards(cards: pd.Series, dimension: pd.DataFrame) -> np.ndarray:
+    """Переводит номера карт в целочисленные коды справочника; пропуски и неизвестные карты получают код -1."""
+    return pd.Index(dimension["Номер карты"]).get_indexer(cards)
+
+
+def partial_card_summary(df: pd.DataFrame, dimension: pd.DataFrame) -> np.ndarray:
+    """ Считает частичную сводку по картам для части таблицы (например, одной партиции).
+    Args: df (pandas.DataFrame): Операции со столбцами "Номер карты", "Сумма платежа", "Сумма операции с округлением".
+          dimension (pandas.DataFrame): Справочник карт.
+    Returns: numpy.ndarray: Массив формы (2, число карт): суммы расходов и число операций по кодам карт."""
+
+    if df.empty:
+        return np.zeros((2, len(dimension)))
+    spent_df = df[df["Сумма платежа"] < 0]
+    codes = encode_cards(spent_df["Номер карты"], dimension)
+    return card_totals(codes, spent_df["Сумма операции с округлением"].to_numpy(dtype=float), len(dimension))
+
+
+def card_totals(codes: np.ndarray, amounts: np.ndarray, n_cards: int) -> np.ndarray:
+    """ Накапливает суммы и число операций по кодам карт; строки с кодом -1 пропускаются.
+    Пропущенные суммы не учитываются в сумме, как в groupby().sum()."""
+    known = codes >= 0
+    return np.vstack(
+        [
+            np.bincount(codes[known], weights=np.nan_to_num(amounts[known]), minlength=n_cards),
+            np.bincount(codes[known], minlength=n_cards).astype(float),
+        ]
+    )
+
+
+def merge_card_summaries(partials: Iterable[np.ndarray], n_cards: int) -> np.ndarray:
+    """Складывает частичные сводки; сводки, посчитанные до появления новых карт, дополняются нулями."""
+    merged = np.zeros((2, n_cards))
+    for partial in partials:
+        merged[:, :partial.shape[1]] += partial
+    return merged
+
+
+def card_summary_records(summary: np.ndarray, dimension: pd.DataFrame) -> list[dict]:
+    """Формирует сводку по картам с операциями в порядке номеров карт."""
+    order = np.argsort(dimension["Номер карты"].to_numpy(dtype=str), kind="stable")
+    result = []
+    for code in order:
+        if summary[OPERATIONS, code] == 0:
+            continue
+        total_spent = summary[TOTAL_SPENT, code]
+        result.append(
+            {
+                "last_digits": dimension["last_digits"].iat[code],
+                "total_spent": round(total_spent, 2),
+                "cashback": round(total_spent * STANDARD_CASHBACK_RATE, 2),
+            }
+        )
+    return result
@@ -0,0 +1,286 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import requests
+from dotenv import load_dotenv
+
+PATH_TO_RATES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "currency_rates.csv")
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля currency."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "currency.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+BASE_CURRENCY = "RUB"
+RATES_COLUMNS = ["date", "currency", "rate"]
+
+# Столбцы, которые пересчитываются в базовую валюту (в выгрузке они указаны в валюте платежа)
+CONVERTED_COLUMNS = ["Сумма платежа", "Сумма операции с округлением"]
+CURRENCY_COLUMN = "Валюта платежа"
+ORIGINAL_AMOUNT_COLUMN = "Исходная сумма платежа"
+ORIGINAL_CURRENCY_COLUMN = "Исходная валюта платежа"
+
+# Столбцы, которые читает пересчёт (включая оценку курсов по валютным операциям самой выгрузки)
+CURRENCY_SOURCE_COLUMNS = [
+    "Дата операции",
+    "Сумма операции",
+    "Валюта операции",
+    "Сумма платежа",
+    "Валюта платежа",
+    "Сумма операции с округлением",
+]
+
+# API отдаёт курсы не более чем за год одним запросом
+TIMESERIES_MAX_DAYS = 365
+
+# Разрыв между границей периода и ближайшим курсом, при котором курсы не догружаются (выходные, праздники)
+RATES_MAX_GAP = pd.Timedelta(days=7)
+
+
+def _rates_frame(dates: Iterable, currencies: Iterable, rates: Iterable) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(pd.Series(list(dates), dtype=object)),
+            "currency": pd.Series(list(currencies), dtype=object),
+            "rate": pd.Series(list(rates), dtype=float),
+        }
+    )
+
+
+def load_rates(path: str = PATH_TO_RATES) -> pd.DataFrame:
+    """ Читает таблицу исторических курсов из CSV-файла.
+    Args: path (str): Путь к файлу со столбцами date, currency, rate (сколько единиц базовой валюты стоит
+                      единица валюты).
+    Returns: pandas.DataFrame: Курсы, отсортированные по валюте и дате, или пустая таблица, если файла нет."""
+
+    if not os.path.exists(path):
+        logger.debug(f"Файл курсов {path} не найден.")
+        return _rates_frame([], [], [])
+    rates = pd.read_csv(path, parse_dates=["date"])[RATES_COLUMNS]
+    logger.debug(f"Прочитано курсов из {path}: {len(rates)}.")
+    return rates.sort_values(["currency", "date"], ignore_index=True)
+
+
+def save_rates(rates: pd.DataFrame, path: str = PATH_TO_RATES) -> None:
+    """Сохраняет таблицу исторических курсов в CSV-файл."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    rates[RATES_COLUMNS].to_csv(path, index=False, date_format="%Y-%m-%d")
+    logger.debug(f"Сохранено курсов в {path}: {len(rates)}.")
+
+
+def fetch_rates(
+        currencies: list[str],
+        start_date: datetime,
+        end_date: datetime,
+        base_currency: str = BASE_CURRENCY
+) -> pd.DataFrame:
+    """ Загружает исторические курсы у провайдера курсов валют (запросами не длиннее года).
+    Args: currencies (list[str]): Коды валют.
+          start_date, end_date (datetime): Период курсов включительно.
+          base_currency (str): Базовая валюта.
+    Returns: pandas.DataFrame: Курсы в формате load_rates; пустая таблица, если провайдер недоступен."""
+
+    load_dotenv()
+    api_key = os.getenv("API_KEY_APILAYER")
+    if not api_key or not currencies:
+        logger.debug("Ключ API курсов валют не задан, загрузка курсов пропущена.")
+        return _rates_frame([], [], [])
+
+    url = "https://api.apilayer.com/exchangerates_data/timeseries"
+    headers = {"apikey": api_key}
+    dates, codes, values = [], [], []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=TIMESERIES_MAX_DAYS - 1), end_date)
+        payload = {
+            "start_date": chunk_start.strftime("%Y-%m-%d"),
+            "end_date": chunk_end.strftime("%Y-%m-%d"),
+            "base": base_currency,
+            "symbols": ",".join(currencies),
+        }
+        try:
+            response = requests.get(url, headers=headers, params=payload, timeout=30)
+        except requests.RequestException as e:
+            logger.error(f"Не удалось получить исторические курсы валют {currencies}: {e}")
+            return _rates_frame([], [], [])
+        if response.status_code != 200:
+            logger.error(f"Неудачная попытка получить исторические курсы валют {currencies}. "
+                         f"Возможная причина: {response.reason}.")
+            return _rates_frame([], [], [])
+        for day, day_rates in response.json()["rates"].items():
+            for currency, value in day_rates.items():
+                # Провайдер отдаёт, сколько единиц валюты стоит единица базовой — нам нужно обратное
+                dates.append(day)
+                codes.append(currency)
+                values.append(1 / value)
+        chunk_start = chunk_end + timedelta(days=1)
+
+    logger.info(f"Получено исторических курсов валют {currencies}: {len(values)}.")
+    return _rates_frame(dates, codes, values)
+
+
+def get_rates(
+        currencies: list[str],
+        start_date: datetime,
+        end_date: datetime,
+        path: str = PATH_TO_RATES,
+        base_currency: str = BASE_CURRENCY
+) -> pd.DataFrame:
+    """ Возвращает курсы из локальной таблицы, догружая у провайдера валюты, которые не покрывают период.
+    Догруженные курсы сохраняются в локальную таблицу.
+    Args: currencies (list[str]): Коды валют.
+          start_date, end_date (datetime): Период операций.
+          path (str): Путь к локальной таблице курсов.
+          base_currency (str): Базовая валюта.
+    Returns: pandas.DataFrame: Курсы в формате load_rates."""
+
+    rates = load_rates(path)
+    coverage = rates.groupby("currency")["date"].agg(["min", "max"])
+    start, end = pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize()
+    missing = [
+        currency for currency in currencies
+        if currency not in coverage.index
+        or coverage.at[currency, "min"] - start > RATES_MAX_GAP
+        or end - coverage.at[currency, "max"] > RATES_MAX_GAP
+    ]
+    if not missing:
+        return rates
+
+    fetched = fetch_rates(missing, start_date, end_date, base_currency)
+    if fetched.empty:
+        return rates
+    rates = pd.concat([rates[~rates["currency"].isin(missing)], fetched], ignore_index=True)
+    rates = rates.sort_values(["currency", "date"], ignore_index=True)
+    save_rates(rates, path)
+    return rates
+
+
+def implied_rates(df: pd.DataFrame, base_currency: str = BASE_CURRENCY) -> pd.DataFrame:
+    """ Оценивает курсы по валютным операциям самой выгрузки: если операция в одной валюте оплачена в другой,
+    отношение сумм платежа и операции даёт курс банка на дату операции.
+    Args: df (pandas.DataFrame): Операции со столбцами CURRENCY_SOURCE_COLUMNS.
+          base_currency (str): Базовая валюта.
+    Returns: pandas.DataFrame: Курсы в формате load_rates."""
+
+    if any(column not in df.columns for column in CURRENCY_SOURCE_COLUMNS) or df.empty:
+        return _rates_frame([], [], [])
+
+    dates = pd.to_datetime(df["Дата операции"], dayfirst=True, errors="coerce").dt.normalize()
+    operation = df["Сумма операции"].abs().to_numpy(dtype=float)
+    payment = df["Сумма платежа"].abs().to_numpy(dtype=float)
+    valid = dates.notna().to_numpy() & (operation > 0) & (payment > 0)
+
+    # Операция в валюте, платёж в базовой — и наоборот
+    paid_in_base = valid & (df[CURRENCY_COLUMN] == base_currency).to_numpy() & (
+        df["Валюта операции"] != base_currency).to_numpy()
+    bought_in_base = valid & (df["Валюта операции"] == base_currency).to_numpy() & (
+        df[CURRENCY_COLUMN] != base_currency).to_numpy()
+
+    rates = _rates_frame(
+        np.concatenate([dates[paid_in_base].to_numpy(), dates[bought_in_base].to_numpy()]),
+        np.concatenate(
+            [df["Валюта операции"][paid_in_base].to_numpy(), df[CURRENCY_COLUMN][bought_in_base].to_numpy()]
+        ),
+        np.concatenate([payment[paid_in_base] / operation[paid_in_base],
+                        operation[bought_in_base] / payment[bought_in_base]]),
+    )
+    # Несколько операций за день усредняются в один курс
+    rates = rates.groupby(["currency", "date"], as_index=False)["rate"].mean()[RATES_COLUMNS]
+    logger.debug(f"По валютным операциям выгрузки оценено курсов: {len(rates)}.")
+    return rates
+
+
+def convert_to_base(df: pd.DataFrame, rates: pd.DataFrame, base_currency: str = BASE_CURRENCY) -> pd.DataFrame:
+    """ Пересчитывает суммы платежа в базовую валюту по курсу на дату операции (as-of: последний известный курс
+    не позже даты операции; для операций раньше первого курса берётся ближайший следующий).
+    Исходные сумма и валюта платежа сохраняются в столбцах ORIGINAL_AMOUNT_COLUMN и ORIGINAL_CURRENCY_COLUMN.
+    Args: df (pandas.DataFrame): Операции.
+          rates (pandas.DataFrame): Курсы в формате load_rates.
+          base_currency (str): Базовая валюта.
+    Returns: pandas.DataFrame: Копия таблицы с суммами в базовой валюте."""
+
+    df = df.copy()
+    df[ORIGINAL_AMOUNT_COLUMN] = df["Сумма платежа"]
+    df[ORIGINAL_CURRENCY_COLUMN] = df[CURRENCY_COLUMN]
+
+    dates = pd.to_datetime(df["Дата операции"], dayfirst=True, errors="coerce")
+    foreign = ((df[CURRENCY_COLUMN] != base_currency) & df[CURRENCY_COLUMN].notna() & dates.notna()).to_numpy()
+    if not foreign.any():
+        return df
+
+    # merge_asof требует сортировки по ключу; позиция строки возвращает результат на место
+    left = pd.DataFrame(
+        {"date": dates[foreign].to_numpy(), "currency": df[CURRENCY_COLUMN][foreign].to_numpy(),
+         "position": np.flatnonzero(foreign)}
+    ).sort_values("date", kind="stable")
+    right = rates.dropna(subset=["date", "rate"]).sort_values("date", kind="stable")
+    backward = pd.merge_asof(left, right, on="date", by="currency", direction="backward")
+    forward = pd.merge_asof(left, right, on="date", by="currency", direction="forward")
+    rate = backward["rate"].fillna(forward["rate"]).to_numpy()
+    positions = backward["position"].to_numpy()
+
+    known = ~np.isnan(rate)
+    if not known.all():
+        unknown = sorted(set(backward["currency"][~known]))
+        logger.warning(f"Нет курсов для валют {unknown}: {int((~known).sum())} операций не пересчитаны.")
+
+    converted = positions[known]
+    for column in CONVERTED_COLUMNS:
+        if column in df.columns:
+            values = df[column].to_numpy(dtype=float, copy=True)
+            values[converted] = np.round(values[converted] * rate[known], 2)
+            df[column] = values
+    currencies = df[CURRENCY_COLUMN].to_numpy(dtype=object, copy=True)
+    currencies[converted] = base_currency
+    df[CURRENCY_COLUMN] = currencies
+    logger.info(f"Пересчитано в {base_currency} операций: {len(converted)}.")
+    return df
+
+
+def convert_operations(
+        df: pd.DataFrame,
+        path: str = PATH_TO_RATES,
+        base_currency: str = BASE_CURRENCY
+) -> pd.DataFrame:
+    """ Пересчитывает выгрузку в базовую валюту при загрузке: курсы берутся из локальной таблицы
+    (с догрузкой у провайдера), недостающие валюты дополняются курсами, оценёнными по самой выгрузке.
+    Args: df (pandas.DataFrame): Операции.
+          path (str): Путь к локальной таблице курсов.
+          base_currency (str): Базовая валюта.
+    Returns: pandas.DataFrame: Операции с суммами в базовой валюте."""
+
+    if df.empty or CURRENCY_COLUMN not in df.columns or "Дата операции" not in df.columns:
+        return df
+
+    dates = pd.to_datetime(df["Дата операции"], dayfirst=True, errors="coerce")
+    foreign = (df[CURRENCY_COLUMN] != base_currency) & df[CURRENCY_COLUMN].notna() & dates.notna()
+    if not foreign.any():
+        return df
+
+    currencies = sorted(df.loc[foreign, CURRENCY_COLUMN].unique())
+    rates = get_rates(currencies, dates[foreign].min(), dates[foreign].max(), path, base_currency)
+    estimated = implied_rates(df, base_currency)
+    rates = pd.concat([rates, estimated[~estimated["currency"].isin(rates["currency"])]], ignore_index=True)
+    return convert_to_base(df, rates, base_currency)
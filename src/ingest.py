@@ -0,0 +1,307 @@
+import importlib.util
+import logging
+import os
+import posixpath
+import re
+import zipfile
+from typing import Callable, Optional, Sequence
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля ingest."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "ingest.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+SHEET_NAME = "Отчет по операциям"
+
+OPERATION_COLUMNS = [
+    "Дата операции",
+    "Дата платежа",
+    "Номер карты",
+    "Статус",
+    "Сумма операции",
+    "Валюта операции",
+    "Сумма платежа",
+    "Валюта платежа",
+    "Кэшбэк",
+    "Категория",
+    "MCC",
+    "Описание",
+    "Бонусы (включая кэшбэк)",
+    "Округление на инвесткопилку",
+    "Сумма операции с округлением",
+]
+
+Reader = Callable[[str, Optional[Sequence[str]]], pd.DataFrame]
+
+# Зарегистрированные движки чтения: имя -> (функция чтения, модули, хотя бы один из которых нужен для работы)
+ENGINES: dict[str, tuple[Reader, tuple[str, ...]]] = {}
+
+# Движок по расширению файла; для Excel выбирается первый доступный из списка.
+# Встроенный xml доступен всегда и быстрее openpyxl, поэтому openpyxl остаётся последним вариантом
+ENGINES_BY_EXTENSION = {
+    ".xlsx": ("calamine", "xml", "openpyxl"),
+    ".xlsm": ("calamine", "xml", "openpyxl"),
+    ".csv": ("csv",),
+    ".parquet": ("parquet",),
+    ".pq": ("parquet",),
+}
+
+
+def register_engine(name: str, reader: Reader, requires: Sequence[str] = ()) -> None:
+    """ Регистрирует движок чтения файла операций.
+    Args: name (str): Имя движка.
+          reader (Callable): Функция (path, columns) -> DataFrame.
+          requires (Sequence[str]): Модули, хотя бы один из которых должен быть установлен."""
+    ENGINES[name] = (reader, tuple(requires))
+
+
+def is_engine_available(name: str) -> bool:
+    """Проверяет, зарегистрирован ли движок и установлены ли его зависимости."""
+    if name not in ENGINES:
+        return False
+    requires = ENGINES[name][1]
+    return not requires or any(importlib.util.find_spec(module) is not None for module in requires)
+
+
+def available_engines() -> list[str]:
+    """Возвращает список движков, которые можно использовать в текущем окружении."""
+    return [name for name in ENGINES if is_engine_available(name)]
+
+
+def resolve_engine(path: str, engine: str = "auto") -> str:
+    """ Определяет движок чтения для файла.
+    Args: path (str): Путь к файлу.
+          engine (str): Имя движка или "auto" для выбора по расширению файла.
+    Returns: str: Имя доступного движка."""
+
+    if engine != "auto":
+        if engine not in ENGINES:
+            raise ValueError(f"Неизвестный движок чтения: {engine}. Доступные движки: {', '.join(ENGINES)}")
+        if not is_engine_available(engine):
+            raise ImportError(f"Для движка {engine} требуется один из модулей: {', '.join(ENGINES[engine][1])}")
+        return engine
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in ENGINES_BY_EXTENSION:
+        raise ValueError(f"Неподдерживаемый формат файла: {extension}")
+    for candidate in ENGINES_BY_EXTENSION[extension]:
+        if is_engine_available(candidate):
+            return candidate
+    raise ImportError(f"Нет доступного движка для файлов {extension}")
+
+
+def read_operations(
+        path: str,
+        engine: str = "auto",
+        columns: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """ Читает выгрузку "Отчет по операциям" выбранным движком.
+    Args: path (str): Путь к файлу (.xlsx, .csv или .parquet).
+          engine (str): Имя движка или "auto".
+          columns (Sequence[str]): Столбцы, которые нужно прочитать (по умолчанию все).
+    Returns: pandas.DataFrame: Таблица операций."""
+
+    engine_name = resolve_engine(path, engine)
+    reader = ENGINES[engine_name][0]
+    df = reader(path, list(columns) if columns is not None else None)
+    logger.debug(f"Файл {path} прочитан движком {engine_name}: {len(df)} строк, {len(df.columns)} столбцов.")
+    return df
+
+
+def _read_excel_openpyxl(path: str, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    return pd.read_excel(path, sheet_name=SHEET_NAME, usecols=columns, engine="openpyxl")
+
+
+def _read_excel_calamine(path: str, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    return pd.read_excel(path, sheet_name=SHEET_NAME, usecols=columns, engine="calamine")
+
+
+def _read_csv(path: str, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    return pd.read_csv(path, usecols=columns)
+
+
+def _read_parquet(path: str, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    return pd.read_parquet(path, columns=columns)
+
+
+# ------------------------------------------------------------------------------------
+# Потоковый разбор xlsx без сторонних библиотек
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PACKAGE_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Встроенные форматы дат Excel (ECMA-376, 18.8.30)
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+DATE_FORMAT_PATTERN = re.compile(r"[dmyhs]", re.IGNORECASE)
+CELL_REF_PATTERN = re.compile(r"([A-Z]+)")
+
+
+def _column_index(cell_ref: str) -> int:
+    letters = CELL_REF_PATTERN.match(cell_ref).group(1)  # type: ignore[union-attr]
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _sheet_path(archive: zipfile.ZipFile, sheet_name: str) -> str:
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    relation_id = None
+    for sheet in workbook.iter(f"{NS_MAIN}sheet"):
+        if sheet.get("name") == sheet_name:
+            relation_id = sheet.get(f"{NS_REL}id")
+    if relation_id is None:
+        raise ValueError(f"Лист {sheet_name} не найден")
+
+    relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for relation in relations.iter(f"{NS_PACKAGE_REL}Relationship"):
+        if relation.get("Id") == relation_id:
+            target = relation.get("Target", "")
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+    raise ValueError(f"Не найден файл листа {sheet_name}")
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as file:
+        for _, element in ElementTree.iterparse(file):
+            if element.tag == f"{NS_MAIN}si":
+                # Текст лежит либо в <t>, либо в форматированных фрагментах <r><t>; фонетические <rPh> пропускаем
+                runs = element.findall(f"{NS_MAIN}t") or element.findall(f"{NS_MAIN}r/{NS_MAIN}t")
+                strings.append("".join(text.text or "" for text in runs))
+                element.clear()
+    return strings
+
+
+def _date_styles(archive: zipfile.ZipFile) -> set[int]:
+    """Возвращает индексы стилей ячеек, у которых формат числа — дата."""
+    if "xl/styles.xml" not in archive.namelist():
+        return set()
+    styles = ElementTree.fromstring(archive.read("xl/styles.xml"))
+    custom_formats = {
+        int(fmt.get("numFmtId", 0)): fmt.get("formatCode", "") for fmt in styles.iter(f"{NS_MAIN}numFmt")
+    }
+    date_formats = set(BUILTIN_DATE_FORMATS)
+    for fmt_id, code in custom_formats.items():
+        # Убираем литералы в кавычках и цвета в квадратных скобках, чтобы не спутать их с кодами дат
+        cleaned = re.sub(r'"[^"]*"|\[[^]]*]', "", code)
+        if DATE_FORMAT_PATTERN.search(cleaned):
+            date_formats.add(fmt_id)
+
+    cell_xfs = styles.find(f"{NS_MAIN}cellXfs")
+    if cell_xfs is None:
+        return set()
+    return {
+        index for index, xf in enumerate(cell_xfs.iter(f"{NS_MAIN}xf")) if int(xf.get("numFmtId", 0)) in date_formats
+    }
+
+
+def _to_column(values: list) -> pd.Series:
+    series = pd.Series(values, dtype=object)
+    non_null = series.dropna()
+    if non_null.empty:
+        return series.astype(float)
+    if non_null.map(type).isin([float]).all():
+        numeric = series.astype(float)
+        # Как и pandas.read_excel, целые значения без пропусков приводим к int64
+        if numeric.notna().all() and (numeric % 1 == 0).all():
+            return numeric.astype("int64")
+        return numeric
+    if non_null.map(type).isin([pd.Timestamp]).all():
+        return pd.to_datetime(series)
+    return series.where(series.notna(), np.nan)
+
+
+def _read_excel_xml(path: str, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    """Читает лист потоковым разбором XML, извлекая значения только нужных столбцов."""
+    with zipfile.ZipFile(path) as archive:
+        strings = _shared_strings(archive)
+        date_styles = _date_styles(archive)
+        sheet_path = _sheet_path(archive, SHEET_NAME)
+
+        header: dict[int, str] = {}
+        wanted: dict[int, list] = {}
+        with archive.open(sheet_path) as file:
+            for _, row in ElementTree.iterparse(file):
+                if row.tag != f"{NS_MAIN}row":
+                    continue
+                if len(row) == 0:
+                    row.clear()
+                    continue
+                is_header = not header
+                row_values: dict[int, object] = {}
+                for position, cell in enumerate(row.iter(f"{NS_MAIN}c")):
+                    ref = cell.get("r")
+                    index = _column_index(ref) if ref else position
+                    if not is_header and index not in wanted:
+                        continue
+                    cell_type = cell.get("t", "n")
+                    if cell_type == "inlineStr":
+                        text = "".join(text.text or "" for text in cell.iter(f"{NS_MAIN}t"))
+                        # Пустые строки, как и в pandas.read_excel, считаем пропусками
+                        if text:
+                            row_values[index] = text
+                        continue
+                    raw = cell.findtext(f"{NS_MAIN}v")
+                    if not raw:
+                        continue
+                    if cell_type == "s":
+                        if strings[int(raw)]:
+                            row_values[index] = strings[int(raw)]
+                    elif cell_type == "b":
+                        row_values[index] = raw == "1"
+                    elif cell_type in ("str", "e"):
+                        row_values[index] = raw
+                    elif int(cell.get("s", 0)) in date_styles:
+                        row_values[index] = pd.Timestamp("1899-12-30") + pd.to_timedelta(float(raw), unit="D")
+                    else:
+                        row_values[index] = float(raw)
+                row.clear()
+
+                if is_header:
+                    header = {index: str(value) for index, value in row_values.items()}
+                    names = list(header.values()) if columns is None else list(columns)
+                    missing = [name for name in names if name not in header.values()]
+                    if missing:
+                        raise ValueError(f"В файле отсутствуют столбцы: {', '.join(missing)}")
+                    wanted = {index: [] for index, name in header.items() if name in names}
+                    continue
+
+                for index, values in wanted.items():
+                    values.append(row_values.get(index))
+
+    if not header:
+        return pd.DataFrame()
+    return pd.DataFrame({header[index]: _to_column(values) for index, values in wanted.items()})
+
+
+register_engine("openpyxl", _read_excel_openpyxl, requires=("openpyxl",))
+register_engine("calamine", _read_excel_calamine, requires=("python_calamine",))
+register_engine("xml", _read_excel_xml)
+register_engine("csv", _read_csv)
+register_engine("parquet", _read_parquet, requires=("pyarrow", "fastparquet"))
@@ -1,18 +1,43 @@
-from src.reports import spending_by_category
-from src.services import get_high_cashback_categories
+import argparse
+
+from src.profiling import PROFILE_DIR, StageProfiler
+from src.reports import SPENDING_BY_CATEGORY_COLUMNS, spending_by_category, spending_by_category_date_range
+from src.services import HIGH_CASHBACK_COLUMNS, get_high_cashback_categories, high_cashback_date_range
 from src.utils import read_data_file
 from src.views import main_info
 
 if __name__ == "__main__":
 
-    df = read_data_file()
+    parser = argparse.ArgumentParser(description="Анализ банковских операций")
+    parser.add_argument("--profile", action="store_true", help="Профилировать этапы (cProfile и tracemalloc)")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="Каталог для отчётов профилирования")
+    args = parser.parse_args()
+    profiler = StageProfiler(args.profile_dir, enabled=args.profile)
+
+    # Общий список столбцов: второе чтение без хранилища берёт уже пересчитанную выгрузку из памяти
+    report_columns = list(dict.fromkeys(SPENDING_BY_CATEGORY_COLUMNS + HIGH_CASHBACK_COLUMNS))
+    spending_start, spending_end = spending_by_category_date_range("01.02.2018")
+    spending_df = profiler.run(
+        "read_spending_by_category", read_data_file,
+        columns=report_columns, start_date=spending_start, end_date=spending_end,
+    )
+    cashback_start, cashback_end = high_cashback_date_range("2021", "05")
+    cashback_df = profiler.run(
+        "read_high_cashback_categories", read_data_file,
+        columns=report_columns, start_date=cashback_start, end_date=cashback_end,
+    )
 
-    result_views = main_info("2021-04-10 20:30:00")
+    result_views = profiler.run("main_info", main_info, "2021-04-10 20:30:00")
     print(result_views)
 
-    result_reports = spending_by_category(df, "Топливо", "01.02.2018")
+    result_reports = profiler.run("spending_by_category", spending_by_category, spending_df, "Топливо", "01.02.2018")
     print(result_reports)
 
-    result_services = get_high_cashback_categories(df,"2021", "05")
+    result_services = profiler.run(
+        "get_high_cashback_categories", get_high_cashback_categories, cashback_df, "2021", "05"
+    )
     print(result_services)
 
+    if args.profile:
+        print(f"Отчёты профилирования: {profiler.write_summary()}")
+
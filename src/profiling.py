@@ -0,0 +1,189 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "profiles")
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля profiling."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "profiling.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+DEFAULT_TOP = 25
+# Для статистики по строкам кода достаточно одного кадра; больше кадров многократно замедляет запуск
+TRACEMALLOC_FRAMES = 1
+
+# Функции, на которые обычно приходятся регрессии: их накопленное время выводится отдельной строкой отчёта
+WATCHED_FUNCTIONS = ("read_excel", "load_workbook", "read_operations", "to_datetime", "groupby", "iterrows", "dumps")
+
+# Строки, обработанные текущим этапом (сообщаются загрузчиками через record_rows)
+_active_rows: Optional[list[int]] = None
+
+
+def record_rows(count: int) -> None:
+    """Сообщает профилировщику, сколько строк прочитал текущий этап; вне профилирования ничего не делает."""
+    if _active_rows is not None:
+        _active_rows.append(count)
+
+
+def _stage_rows(args: tuple, kwargs: dict, result: Any, recorded: list[int]) -> Optional[int]:
+    """Строки этапа: прочитанные загрузчиком, иначе размер входных таблиц, иначе размер результата."""
+    if recorded:
+        return sum(recorded)
+    frames = [value for value in (*args, *kwargs.values()) if isinstance(value, pd.DataFrame)]
+    if frames:
+        return sum(len(frame) for frame in frames)
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    return None
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name)
+
+
+class StageProfiler:
+    """ Профилирует этапы запуска (cProfile + tracemalloc) и пишет по каждому отчёт в каталог.
+    Для этапа сохраняются: текстовый отчёт с топом функций и мест выделения памяти, файл .prof
+    (открывается snakeviz, flameprof и другими просмотрщиками flame-графов) и строка в summary.json."""
+
+    def __init__(self, output_dir: str = PROFILE_DIR, enabled: bool = True, top: int = DEFAULT_TOP) -> None:
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.top = top
+        self.stages: list[dict] = []
+
+    def run(self, name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """ Выполняет этап; при включённом профилировании снимает профиль и пишет отчёт.
+        Args: name (str): Название этапа (используется в именах файлов).
+              func (Callable): Функция этапа; остальные аргументы передаются ей.
+        Returns: Any: Результат функции."""
+
+        if not self.enabled:
+            return func(*args, **kwargs)
+
+        global _active_rows
+        recorded: list[int] = []
+        profile = cProfile.Profile()
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        _active_rows = recorded
+        started = time.perf_counter()
+        try:
+            profile.enable()
+            result = func(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            _active_rows = None
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if not was_tracing:
+                tracemalloc.stop()
+
+        stage = self._write_stage(
+            name, profile, snapshot, elapsed, peak - start_memory, _stage_rows(args, kwargs, result, recorded)
+        )
+        self.stages.append(stage)
+        logger.info(f"Этап {name}: {elapsed:.3f} с, пик памяти {stage['peak_memory_mb']} МБ, строк {stage['rows']}.")
+        return result
+
+    def _write_stage(
+            self,
+            name: str,
+            profile: cProfile.Profile,
+            snapshot: tracemalloc.Snapshot,
+            elapsed: float,
+            peak: int,
+            rows: Optional[int]
+    ) -> dict:
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"{len(self.stages) + 1:02d}_{_safe_name(name)}")
+        profile.dump_stats(f"{prefix}.prof")
+
+        stats = pstats.Stats(profile)
+        watched = {function: 0.0 for function in WATCHED_FUNCTIONS}
+        top_functions = []
+        for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            if function in watched:
+                watched[function] += cumtime
+            top_functions.append(
+                {"function": f"{os.path.basename(filename)}:{line}({function})", "ncalls": ncalls,
+                 "tottime": round(tottime, 4), "cumtime": round(cumtime, 4)}
+            )
+        top_functions = sorted(top_functions, key=lambda item: item["cumtime"], reverse=True)[:self.top]
+
+        this_file = tracemalloc.Filter(False, __file__)
+        allocations = snapshot.filter_traces([this_file, tracemalloc.Filter(False, tracemalloc.__file__)])
+        top_allocations = [
+            {"site": str(statistic.traceback[0]), "size_kb": round(statistic.size / 1024, 1), "count": statistic.count}
+            for statistic in allocations.statistics("lineno")[:self.top]
+        ]
+
+        stage = {
+            "stage": name,
+            "wall_time_s": round(elapsed, 4),
+            "peak_memory_mb": round(peak / 1024 / 1024, 2),
+            "rows": rows,
+            "rows_per_s": round(rows / elapsed) if rows and elapsed > 0 else None,
+            "watched_functions_s": {function: round(value, 4) for function, value in watched.items() if value},
+            "top_functions": top_functions,
+            "top_allocations": top_allocations,
+        }
+
+        buffer = io.StringIO()
+        pstats.Stats(profile, stream=buffer).sort_stats("cumulative").print_stats(self.top)
+        with open(f"{prefix}.txt", "w", encoding="utf-8") as file:
+            file.write(f"Этап: {name}\n")
+            file.write(f"Время: {elapsed:.3f} с (с учётом накладных расходов cProfile и tracemalloc)\n")
+            file.write(f"Строк обработано: {rows if rows is not None else 'н/д'}\n")
+            file.write(f"Пиковая память: {stage['peak_memory_mb']} МБ\n")
+            file.write("Накопленное время отслеживаемых функций: ")
+            file.write(", ".join(f"{key} {value} с" for key, value in stage["watched_functions_s"].items()) or "—")
+            file.write("\n\nМеста выделения памяти:\n")
+            for allocation in top_allocations:
+                file.write(f"  {allocation['size_kb']:>10} КБ  {allocation['count']:>8}  {allocation['site']}\n")
+            file.write("\nФункции по накопленному времени:\n")
+            file.write(buffer.getvalue())
+        return stage
+
+    def write_summary(self) -> Optional[str]:
+        """Записывает сводку по всем этапам в summary.json и возвращает путь к ней."""
+        if not self.enabled:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, "summary.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"stages": self.stages}, file, ensure_ascii=False, indent=4)
+        logger.info(f"Отчёты профилирования сохранены в {self.output_dir}.")
+        return path
@@ -29,6 +29,25 @@ def setup_logger() -> logging.Logger:
 
 logger = setup_logger()
 
+# Столбцы, которые читает отчёт о расходах по категории
+SPENDING_BY_CATEGORY_COLUMNS = ["Дата операции", "Сумма платежа", "Категория", "Описание"]
+
+# Отчёт о расходах по категории охватывает 90 дней до даты отчёта
+SPENDING_WINDOW_DAYS = 90
+
+
+def spending_by_category_date_range(start_date: Optional[Union[str, datetime]] = None) -> tuple[datetime, datetime]:
+    """ Диапазон дат, который читает spending_by_category.
+    :param start_date: Строка в формате 'ДД.ММ.ГГГГ' или datetime (по умолчанию текущая дата).
+    :return: Начало и конец диапазона включительно."""
+    if start_date is None:
+        start_dt = datetime.now()
+    elif isinstance(start_date, str):
+        start_dt = datetime.strptime(start_date, '%d.%m.%Y')
+    else:
+        start_dt = start_date
+    return start_dt - timedelta(days=SPENDING_WINDOW_DAYS), start_dt
+
 
 def spending_by_category(
         transactions: pd.DataFrame,
@@ -42,14 +61,7 @@ def spending_by_category(
     :return: JSON-строка с расходами по дате и сумме."""
 
     try:
-        if start_date is None:
-            start_dt = datetime.now()
-        elif isinstance(start_date, str):
-            start_dt = datetime.strptime(start_date, '%d.%m.%Y')
-        else:
-            start_dt = start_date
-
-        end_dt = start_dt - timedelta(days=90)
+        end_dt, start_dt = spending_by_category_date_range(start_date)
 
         transactions["Дата операции"] = pd.to_datetime(transactions["Дата операции"], dayfirst=True)
 
@@ -66,13 +78,17 @@ def spending_by_category(
             logger.info(f"Нет трат в категории '{category}' за указанный период.")
             return json.dumps({category: []}, ensure_ascii=False, indent=4)
 
+        # Столбцы обходятся целиком, без построения Series на каждую строку (iterrows)
+        descriptions = spent_df["Описание"] if "Описание" in spent_df.columns else [""] * len(spent_df)
         result = [
             {
-                "Дата операции": row["Дата операции"].strftime("%Y-%m-%d"),
-                "Сумма платежа": round(row["Сумма платежа"], 2),
-                "Описание": row.get("Описание", "")
+                "Дата операции": date,
+                "Сумма платежа": round(amount, 2),
+                "Описание": description
             }
-            for _, row in spent_df.iterrows()
+            for date, amount, description in zip(
+                spent_df["Дата операции"].dt.strftime("%Y-%m-%d"), spent_df["Сумма платежа"], descriptions
+            )
         ]
 
         logger.info(f"Получены траты по категории '{category}' — {len(result)} записей.")
@@ -0,0 +1,229 @@
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.cards import NO_CARD
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля search."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "search.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+TOKEN_PATTERN = re.compile(r"\w+")
+NGRAM_SIZE = 3
+
+
+def tokenize(text: str) -> list[str]:
+    """Разбивает текст на слова в нижнем регистре."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class DescriptionIndex:
+    """ Инвертированный индекс по столбцу "Описание".
+    Уникальные описания индексируются по словам и n-граммам; каждой строке таблицы соответствует код описания,
+    а для фильтрации и выдачи результатов индекс хранит дату, категорию, карту и сумму операции."""
+
+    def __init__(self, ngram_size: int = NGRAM_SIZE) -> None:
+        self.ngram_size = ngram_size
+        self._descriptions: list[str] = []
+        self._lowered: list[str] = []
+        self._codes_by_description: dict[str, int] = {}
+        self._tokens: dict[str, set[int]] = {}
+        self._ngrams: dict[str, set[int]] = {}
+
+        self._row_codes = np.empty(0, dtype=np.int64)
+        self._dates = np.empty(0, dtype="datetime64[ns]")
+        self._categories = np.empty(0, dtype=object)
+        self._cards = np.empty(0, dtype=object)
+        self._amounts = np.empty(0, dtype=float)
+        self._rows_by_code: Optional[tuple[np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self._row_codes)
+
+    def _add_description(self, text: str) -> int:
+        code = len(self._descriptions)
+        lowered = text.lower()
+        self._descriptions.append(text)
+        self._lowered.append(lowered)
+        self._codes_by_description[text] = code
+        for token in set(tokenize(text)):
+            self._tokens.setdefault(token, set()).add(code)
+        for start in range(len(lowered) - self.ngram_size + 1):
+            self._ngrams.setdefault(lowered[start:start + self.ngram_size], set()).add(code)
+        return code
+
+    def append(self, df: pd.DataFrame) -> None:
+        """ Добавляет операции в индекс; новые строки получают идентификаторы после уже проиндексированных.
+        Args: df (pandas.DataFrame): Операции со столбцом "Описание"."""
+
+        if df.empty:
+            return
+        local_codes, uniques = pd.factorize(df["Описание"].fillna("").astype(str))
+        # Разбираем на слова и n-граммы только описания, которых ещё нет в индексе
+        mapping = np.array([self._codes_by_description.get(text, -1) for text in uniques], dtype=np.int64)
+        for position in np.flatnonzero(mapping < 0):
+            mapping[position] = self._add_description(uniques[position])
+
+        def column(name: str, dtype: object) -> np.ndarray:
+            if name not in df.columns:
+                return np.full(len(df), None if dtype is object else np.nan, dtype=dtype)
+            return df[name].to_numpy(dtype=dtype)
+
+        dates = pd.to_datetime(df["Дата операции"], dayfirst=True, errors="coerce").to_numpy("datetime64[ns]")
+        self._row_codes = np.concatenate([self._row_codes, mapping[local_codes]])
+        self._dates = np.concatenate([self._dates, dates])
+        self._categories = np.concatenate([self._categories, column("Категория", object)])
+        # Операции без карты хранятся под NO_CARD, как в read_data_file
+        cards = df["Номер карты"].fillna(NO_CARD) if "Номер карты" in df.columns else pd.Series(None, index=df.index)
+        self._cards = np.concatenate([self._cards, cards.to_numpy(dtype=object)])
+        self._amounts = np.concatenate([self._amounts, column("Сумма операции с округлением", float)])
+        self._rows_by_code = None
+        logger.debug(f"В индекс добавлено {len(df)} строк, уникальных описаний: {len(self._descriptions)}.")
+
+    def _match_token(self, token: str) -> set[int]:
+        if len(token) < self.ngram_size:
+            # Короткий запрос ищем как начало слова по словарю индекса
+            matched: set[int] = set()
+            for indexed_token, codes in self._tokens.items():
+                if indexed_token.startswith(token):
+                    matched |= codes
+            return matched
+
+        grams = [token[start:start + self.ngram_size] for start in range(len(token) - self.ngram_size + 1)]
+        postings = sorted((self._ngrams.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        # n-граммы дают кандидатов, подстроку проверяем только на них
+        return {code for code in candidates if token in self._lowered[code]}
+
+    def match_descriptions(self, query: str) -> np.ndarray:
+        """Возвращает коды описаний, содержащих все слова запроса (как подстроки, без учёта регистра)."""
+        tokens = tokenize(query)
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+        matched = self._match_token(tokens[0])
+        for token in tokens[1:]:
+            if not matched:
+                break
+            matched &= self._match_token(token)
+        return np.array(sorted(matched), dtype=np.int64)
+
+    def _rows_for_codes(self, codes: np.ndarray) -> np.ndarray:
+        if self._rows_by_code is None:
+            order = np.argsort(self._row_codes, kind="stable")
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(self._row_codes, minlength=len(self._descriptions)))])
+            self._rows_by_code = (order, offsets)
+        order, offsets = self._rows_by_code
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([order[offsets[code]:offsets[code + 1]] for code in codes]))
+
+    def search(
+            self,
+            query: str,
+            start_date: Optional[datetime] = None,
+            end_date: Optional[datetime] = None,
+            category: Optional[str] = None
+    ) -> np.ndarray:
+        """ Ищет операции по описанию с фильтрами по датам и категории.
+        Args: query (str): Название продавца или фрагмент описания.
+              start_date, end_date (datetime): Границы диапазона дат включительно.
+              category (str): Категория операции.
+        Returns: numpy.ndarray: Идентификаторы найденных строк, от новых операций к старым."""
+
+        rows = self._rows_for_codes(self.match_descriptions(query))
+        if len(rows) == 0:
+            return rows
+        mask = np.ones(len(rows), dtype=bool)
+        if start_date is not None:
+            mask &= self._dates[rows] >= np.datetime64(pd.Timestamp(start_date))
+        if end_date is not None:
+            mask &= self._dates[rows] <= np.datetime64(pd.Timestamp(end_date))
+        if category is not None:
+            mask &= self._categories[rows] == category
+        rows = rows[mask]
+        return rows[np.argsort(self._dates[rows], kind="stable")[::-1]]
+
+    def records(self, rows: np.ndarray) -> list[dict]:
+        """Возвращает найденные операции в формате выдачи (пропуски заменяются на None, чтобы JSON был корректным)."""
+        result = []
+        for row in rows:
+            date = self._dates[row]
+            amount = self._amounts[row]
+            category = self._categories[row]
+            card = self._cards[row]
+            result.append(
+                {
+                    "date": None if np.isnat(date) else pd.Timestamp(date).strftime("%d.%m.%Y"),
+                    "amount": None if np.isnan(amount) else round(float(amount), 2),
+                    "category": None if pd.isna(category) else category,
+                    "card": None if pd.isna(card) else card,
+                    "description": self._descriptions[self._row_codes[row]],
+                }
+            )
+        return result
+
+
+def build_search_index(df: pd.DataFrame, ngram_size: int = NGRAM_SIZE) -> DescriptionIndex:
+    """Строит индекс по описаниям операций."""
+    index = DescriptionIndex(ngram_size)
+    index.append(df)
+    logger.info(f"Построен индекс по описаниям: {len(index)} строк.")
+    return index
+
+
+def search_transactions(
+        index: DescriptionIndex,
+        query: str,
+        start_date: Optional[Union[str, datetime]] = None,
+        end_date: Optional[Union[str, datetime]] = None,
+        category: Optional[str] = None,
+        limit: Optional[int] = 50
+) -> str:
+    """ Возвращает JSON с операциями, описание которых содержит запрос.
+    Args: index (DescriptionIndex): Индекс по описаниям.
+          query (str): Название продавца или фрагмент описания.
+          start_date, end_date: Границы диапазона дат в формате 'ДД.ММ.ГГГГ' или datetime.
+          category (str): Категория операции.
+          limit (int): Максимальное число операций в ответе (None — без ограничения).
+    Returns: str: JSON-строка с количеством найденных операций и самими операциями, новые — первыми."""
+
+    logger.debug(f"Поиск операций по запросу '{query}'")
+    try:
+        start_dt = datetime.strptime(start_date, "%d.%m.%Y") if isinstance(start_date, str) else start_date
+        end_dt = datetime.strptime(end_date, "%d.%m.%Y") if isinstance(end_date, str) else end_date
+        if isinstance(end_date, str):
+            end_dt = end_dt.replace(hour=23, minute=59, second=59)
+
+        rows = index.search(query, start_dt, end_dt, category)
+        result = {"query": query, "total": int(len(rows)), "transactions": index.records(rows[:limit])}
+        logger.info(f"По запросу '{query}' найдено операций: {len(rows)}.")
+        return json.dumps(result, ensure_ascii=False, indent=4)
+
+    except Exception as e:
+        logger.error(f"Ошибка в функции search_transactions: {e}")
+        return json.dumps({"error": str(e)}, ensure_ascii=False, indent=4)
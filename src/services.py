@@ -1,8 +1,15 @@
 import json
 import logging
 import os
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
+from src.cards import STANDARD_CASHBACK_RATE
+
+
 def setup_logger() -> logging.Logger:
     """Настраивает логгер для модуля services."""
     logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
@@ -24,6 +31,21 @@ def setup_logger() -> logging.Logger:
 
 logger = setup_logger()
 
+# Столбцы, которые читают функции анализа кешбэка
+HIGH_CASHBACK_COLUMNS = ["Дата операции", "Сумма платежа", "Категория", "Сумма операции с округлением"]
+
+# Категории, по которым кешбэк не начисляется
+EXCLUDED_CATEGORIES = ("Переводы", "Наличные")
+
+
+def high_cashback_date_range(year: str, month: str) -> tuple[datetime, datetime]:
+    """ Диапазон дат, который читает get_high_cashback_categories.
+    Args: year (str): Год в формате YYYY.
+          month (str): Месяц в формате MM.
+    Returns: tuple[datetime, datetime]: Первая и последняя секунда месяца."""
+    period = pd.Period(year=int(year), month=int(month), freq="M")
+    return period.start_time.to_pydatetime(), period.end_time.floor("s").to_pydatetime()
+
 
 def get_high_cashback_categories(df: pd.DataFrame, year: str, month: str) -> str:
     """ Анализирует выгодные категории повышенного кешбэка за указанный месяц.
@@ -40,8 +62,7 @@ def get_high_cashback_categories(df: pd.DataFrame, year: str, month: str) -> str
 
     try:
         # Проверка наличия необходимых столбцов
-        required_columns = ["Дата операции", "Сумма платежа", "Категория", "Сумма операции с округлением"]
-        for column in required_columns:
+        for column in HIGH_CASHBACK_COLUMNS:
             if column not in df.columns:
                 logger.error(f"Ошибка. Отсутствует необходимый столбец: {column}")
                 return json.dumps({"error": f"Отсутствует необходимый столбец: {column}"}, ensure_ascii=False)
@@ -72,8 +93,7 @@ def get_high_cashback_categories(df: pd.DataFrame, year: str, month: str) -> str
 
         # DataFrame только с расходами (исключая переводы)
         spent_df = slice_df[(slice_df["Сумма платежа"] < 0) &
-                            (slice_df["Категория"] != "Переводы") &
-                            (slice_df["Категория"] != "Наличные")]
+                            (~slice_df["Категория"].isin(EXCLUDED_CATEGORIES))]
 
         if spent_df.empty:
             logger.info(f"Нет расходов за месяц {month} (год {year}).")
@@ -92,11 +112,13 @@ def get_high_cashback_categories(df: pd.DataFrame, year: str, month: str) -> str
         #     formatted_sum = f"{row['Сумма операции с округлением']:,.2f}".replace(",", " ")
         #     print(f"Категория: {row['Категория']:<20} Сумма: {formatted_sum} руб.")
 
-        # Сортировка сумм расходов по каждой категории по убыванию
+        # Сортировка сумм расходов по каждой категории по убыванию; при равных суммах категории идут по алфавиту
+        # (groupby уже упорядочил их по названию, устойчивая сортировка сохраняет этот порядок)
         sorted_category_sum = category_sum.sort_values(
             by="Сумма операции с округлением",
             ascending=False,
-            ignore_index=True
+            ignore_index=True,
+            kind="stable"
         )
 
         # Формирование результата
@@ -105,8 +127,7 @@ def get_high_cashback_categories(df: pd.DataFrame, year: str, month: str) -> str
             "cashback_analysis": {}
         }
 
-        # Стандартный процент кешбэка
-        standard_cashback_rate = 0.01  # 1%
+        standard_cashback_rate = STANDARD_CASHBACK_RATE
 
         # Формирование данных для вывода сводной информации по каждой категории
         for index, row in sorted_category_sum.iterrows():
@@ -127,3 +148,119 @@ def get_high_cashback_categories(df: pd.DataFrame, year: str, month: str) -> str
     except Exception as e:
         logger.error(f"Произошла ошибка при анализе данных: {str(e)}")
         return json.dumps({"error": f"Произошла ошибка при анализе данных: {str(e)}"}, ensure_ascii=False)
+
+
+def optimize_cashback_categories(
+        df: pd.DataFrame,
+        rates: pd.DataFrame,
+        n_categories: int = 3,
+        months: Optional[int] = None,
+        by: Optional[str] = None
+) -> str:
+    """ Подбирает N категорий повышенного кешбэка с максимальной ожидаемой выгодой по истории расходов.
+    Args: df (pandas.DataFrame): DataFrame с данными о расходах.
+          rates (pandas.DataFrame): Таблица кандидатов со столбцами "Категория", "cashback_rate" и "cap"
+                                    (месячный лимит кешбэка в рублях; пустое значение — без лимита).
+          n_categories (int): Сколько категорий можно выбрать.
+          months (int): Сколько последних месяцев истории учитывать (по умолчанию вся история).
+          by (str): Столбец, задающий пользователя, например "Номер карты" (по умолчанию — один пользователь).
+    Returns: str: JSON-ответ с выбранными категориями и прогнозом дополнительного кешбэка в месяц."""
+
+    logger.debug("Запуск функции optimize_cashback_categories")
+    if df is None or df.empty:
+        logger.error("Пустой список транзакций передан в функцию.")
+        return json.dumps({"error": "Нет данных для анализа."}, ensure_ascii=False)
+
+    try:
+        required_columns = list(HIGH_CASHBACK_COLUMNS)
+        if by is not None:
+            required_columns.append(by)
+        for column in required_columns:
+            if column not in df.columns:
+                logger.error(f"Ошибка. Отсутствует необходимый столбец: {column}")
+                return json.dumps({"error": f"Отсутствует необходимый столбец: {column}"}, ensure_ascii=False)
+        for column in ("Категория", "cashback_rate", "cap"):
+            if column not in rates.columns:
+                logger.error(f"Ошибка. В таблице ставок отсутствует столбец: {column}")
+                return json.dumps({"error": f"В таблице ставок отсутствует столбец: {column}"}, ensure_ascii=False)
+        if n_categories < 1:
+            return json.dumps({"error": "Количество категорий должно быть положительным"}, ensure_ascii=False)
+        if months is not None and months < 1:
+            return json.dumps({"error": "Количество месяцев должно быть положительным"}, ensure_ascii=False)
+
+        dates = pd.to_datetime(df["Дата операции"], dayfirst=True, errors="coerce")
+        spent_mask = (
+            (df["Сумма платежа"] < 0)
+            & (~df["Категория"].isin(EXCLUDED_CATEGORIES))
+            & df["Категория"].notna()
+            & dates.notna()
+        ).to_numpy()
+        if not spent_mask.any():
+            logger.info("Нет расходов для подбора категорий.")
+            return json.dumps({"info": "Нет расходов для подбора категорий"}, ensure_ascii=False)
+
+        periods = dates[spent_mask].dt.to_period("M")
+        if months is not None:
+            first_period = periods.max() - (months - 1)
+            periods = periods[periods >= first_period]
+        spent_df = df.loc[periods.index]
+
+        # Трёхмерный массив расходов: пользователь x месяц x категория
+        users = spent_df[by].fillna("Не указано") if by is not None else pd.Series("all", index=spent_df.index)
+        user_codes, user_labels = pd.factorize(users, sort=True)
+        month_codes, month_labels = pd.factorize(periods, sort=True)
+        category_codes, category_labels = pd.factorize(spent_df["Категория"], sort=True)
+        shape = (len(user_labels), len(month_labels), len(category_labels))
+        flat_index = (user_codes * shape[1] + month_codes) * shape[2] + category_codes
+        # Пропущенные суммы не учитываются, как в groupby().sum(), иначе выигрыш категории стал бы NaN
+        amounts = np.nan_to_num(spent_df["Сумма операции с округлением"].abs().to_numpy(dtype=float))
+        spend = np.bincount(flat_index, weights=amounts, minlength=int(np.prod(shape))).reshape(shape)
+
+        candidates = rates.drop_duplicates("Категория").set_index("Категория").reindex(category_labels)
+        is_candidate = candidates["cashback_rate"].notna().to_numpy()
+        rate = candidates["cashback_rate"].fillna(0).to_numpy(dtype=float)
+        cap = pd.to_numeric(candidates["cap"]).fillna(np.inf).to_numpy(dtype=float)
+
+        # Ожидаемый месячный кешбэк по каждой категории с учётом лимита и выигрыш относительно стандартной ставки
+        active_months = np.maximum((spend.sum(axis=2) > 0).sum(axis=1), 1).reshape(-1, 1)
+        expected_cashback = np.minimum(spend * rate, cap).sum(axis=1) / active_months
+        gain = expected_cashback - spend.sum(axis=1) * STANDARD_CASHBACK_RATE / active_months
+        gain[:, ~is_candidate] = -np.inf
+
+        # Выигрыш аддитивен по категориям, поэтому оптимальный выбор — N категорий с наибольшим выигрышем
+        order = np.argsort(-gain, axis=1, kind="stable")[:, :n_categories]
+
+        users_result = {}
+        for user_index, user in enumerate(user_labels):
+            selection = []
+            for category_index in order[user_index]:
+                if gain[user_index, category_index] <= 0:
+                    break
+                selection.append(
+                    {
+                        "category": category_labels[category_index],
+                        "cashback_rate": float(rate[category_index]),
+                        "cap": None if np.isinf(cap[category_index]) else float(cap[category_index]),
+                        "expected_cashback": round(float(expected_cashback[user_index, category_index]), 2),
+                        "gain": round(float(gain[user_index, category_index]), 2),
+                    }
+                )
+            users_result[str(user)] = {
+                "selection": selection,
+                "projected_gain": round(sum(item["gain"] for item in selection), 2),
+            }
+
+        result: dict[str, object] = {
+            "period": f"{month_labels.min()} — {month_labels.max()}",
+            "n_categories": n_categories,
+        }
+        if by is None:
+            result.update(users_result["all"])
+        else:
+            result["users"] = users_result
+        logger.info(f"Подобраны категории повышенного кешбэка для {len(user_labels)} пользователей.")
+        return json.dumps(result, indent=4, ensure_ascii=False)
+
+    except Exception as e:
+        logger.error(f"Произошла ошибка при подборе категорий: {str(e)}")
+        return json.dumps({"error": f"Произошла ошибка при подборе категорий: {str(e)}"}, ensure_ascii=False)
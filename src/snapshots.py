@@ -0,0 +1,258 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.reports import SPENDING_BY_CATEGORY_COLUMNS, spending_by_category, spending_by_category_date_range
+from src.services import HIGH_CASHBACK_COLUMNS, get_high_cashback_categories
+
+PATH_TO_SNAPSHOTS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "snapshots.sqlite")
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля snapshots."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "snapshots.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+# Столбцы, которые нужны для построения снимков отчётов
+SNAPSHOT_COLUMNS = list(dict.fromkeys(SPENDING_BY_CATEGORY_COLUMNS + HIGH_CASHBACK_COLUMNS))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    month TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    checksum TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_month ON snapshots (month);
+CREATE TABLE IF NOT EXISTS months (
+    month TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+"""
+
+
+def cashback_key(month: str) -> str:
+    """Ключ снимка анализа кешбэка за месяц "YYYY-MM"."""
+    return f"cashback/{month}"
+
+
+def spending_key(month: str, category: str) -> str:
+    """Ключ снимка отчёта о расходах по категории на конец месяца "YYYY-MM"."""
+    return f"spending/{month}/{category}"
+
+
+def month_end(month: str) -> datetime:
+    """Дата отчёта для месяца "YYYY-MM" — последняя секунда месяца."""
+    return (pd.Period(month, freq="M").end_time.floor("s")).to_pydatetime()
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _pack(report: str) -> tuple[bytes, str]:
+    data = report.encode("utf-8")
+    return gzip.compress(data), hashlib.sha256(data).hexdigest()
+
+
+def month_fingerprints(df: pd.DataFrame, months: pd.Series) -> dict[str, str]:
+    """ Считает отпечаток содержимого каждого месяца: по нему определяется, какие месяцы изменились.
+    Args: df (pandas.DataFrame): Операции.
+          months (pandas.Series): Месяц "YYYY-MM" каждой операции.
+    Returns: dict[str, str]: Месяц -> sha256 от хешей строк месяца."""
+
+    row_hashes = pd.util.hash_pandas_object(df[SNAPSHOT_COLUMNS], index=False).to_numpy()
+    order = np.argsort(months.to_numpy(dtype=str), kind="stable")
+    sorted_months = months.to_numpy(dtype=str)[order]
+    names, starts = np.unique(sorted_months, return_index=True)
+    bounds = list(starts[1:]) + [len(order)]
+    return {
+        str(name): hashlib.sha256(row_hashes[order[start:end]].tobytes()).hexdigest()
+        for name, start, end in zip(names, starts, bounds)
+    }
+
+
+def _window_months(month: str) -> list[str]:
+    """Месяцы, данные которых попадают в отчёт о расходах на конец месяца."""
+    start = pd.Timestamp(spending_by_category_date_range(month_end(month))[0])
+    return [str(period) for period in pd.period_range(start.to_period("M"), pd.Period(month, freq="M"))]
+
+
+def build_snapshots(df: pd.DataFrame, db_path: str = PATH_TO_SNAPSHOTS) -> dict:
+    """ Строит снимки отчётов (месяц) и (месяц × категория) в SQLite-хранилище ключ–значение.
+    Пересчитываются только месяцы, данные которых изменились с прошлого запуска, и отчёты о расходах,
+    в окно которых (reports.SPENDING_WINDOW_DAYS) попадают такие месяцы.
+    Args: df (pandas.DataFrame): Операции со столбцами SNAPSHOT_COLUMNS.
+          db_path (str): Путь к файлу хранилища снимков.
+    Returns: dict: Пересчитанные и удалённые месяцы и число записанных снимков."""
+
+    missing = [column for column in SNAPSHOT_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Отсутствуют столбцы для снимков: {', '.join(missing)}")
+
+    df = df[SNAPSHOT_COLUMNS].copy()
+    df["Дата операции"] = pd.to_datetime(df["Дата операции"], dayfirst=True, errors="coerce")
+    # Индекс хранит исходный порядок строк: в нём отчёты перечисляют операции
+    df = df[df["Дата операции"].notna()].reset_index(drop=True)
+    df = df.sort_values("Дата операции", kind="stable")
+    months = df["Дата операции"].dt.strftime("%Y-%m")
+    fingerprints = month_fingerprints(df, months)
+
+    connection = _connect(db_path)
+    try:
+        stored = dict(connection.execute("SELECT month, fingerprint FROM months").fetchall())
+        touched = {month for month in fingerprints.keys() | stored.keys()
+                   if fingerprints.get(month) != stored.get(month)}
+        removed = sorted(stored.keys() - fingerprints.keys())
+        cashback_months = sorted(touched & fingerprints.keys())
+        spending_months = sorted(
+            month for month in fingerprints if touched.intersection(_window_months(month))
+        )
+
+        rows = []
+        for month in cashback_months:
+            year_str, month_str = month.split("-")
+            part = df[months == month].sort_index()
+            rows.append((cashback_key(month), month, *_pack(get_high_cashback_categories(part, year_str, month_str))))
+
+        dates = df["Дата операции"].to_numpy()
+        for month in spending_months:
+            # Окно берётся у самого отчёта, чтобы снимки не расходились с spending_by_category
+            start, end = spending_by_category_date_range(month_end(month))
+            # Данные отсортированы по дате: окно отчёта берётся срезом, а не фильтрацией всей таблицы
+            lo = np.searchsorted(dates, np.datetime64(start), side="left")
+            hi = np.searchsorted(dates, np.datetime64(end), side="right")
+            window = df.iloc[lo:hi]
+            window = window[window["Сумма платежа"] < 0].sort_index()
+            for category, part in window.groupby("Категория", sort=True):
+                report = spending_by_category(part.copy(), str(category), end)
+                rows.append((spending_key(month, str(category)), month, *_pack(report)))
+
+        with connection:
+            # Удаляются только пересчитываемые виды снимков: месяц, попавший лишь в изменённое окно
+            # отчёта о расходах, сохраняет снимок кешбэка
+            connection.executemany(
+                "DELETE FROM snapshots WHERE key = ?",
+                [(cashback_key(month),) for month in sorted(set(cashback_months) | set(removed))],
+            )
+            connection.executemany(
+                "DELETE FROM snapshots WHERE month = ? AND key LIKE ?",
+                [(month, spending_key(month, "%")) for month in sorted(set(spending_months) | set(removed))],
+            )
+            connection.executemany(
+                "INSERT INTO snapshots (key, month, payload, checksum) VALUES (?, ?, ?, ?)", rows
+            )
+            connection.executemany("DELETE FROM months WHERE month = ?", [(month,) for month in removed])
+            connection.executemany(
+                "INSERT OR REPLACE INTO months (month, fingerprint) VALUES (?, ?)",
+                [(month, fingerprints[month]) for month in sorted(touched & fingerprints.keys())],
+            )
+    finally:
+        connection.close()
+
+    result = {
+        "cashback_months": cashback_months,
+        "spending_months": spending_months,
+        "removed_months": removed,
+        "snapshots": len(rows),
+    }
+    logger.info(
+        f"Снимки {db_path}: пересчитано месяцев {len(cashback_months)} (кешбэк), {len(spending_months)} (расходы), "
+        f"записано снимков {len(rows)}, удалено месяцев {len(removed)}."
+    )
+    return result
+
+
+def read_snapshot(key: str, db_path: str = PATH_TO_SNAPSHOTS) -> Optional[str]:
+    """ Читает снимок по ключу и сверяет контрольную сумму.
+    Args: key (str): Ключ снимка (cashback_key, spending_key).
+          db_path (str): Путь к файлу хранилища снимков.
+    Returns: str | None: JSON-строка отчёта или None, если снимка нет."""
+
+    if not os.path.exists(db_path):
+        return None
+    connection = sqlite3.connect(db_path)
+    try:
+        row = connection.execute("SELECT payload, checksum FROM snapshots WHERE key = ?", (key,)).fetchone()
+    finally:
+        connection.close()
+    if row is None:
+        return None
+    data = gzip.decompress(row[0])
+    if hashlib.sha256(data).hexdigest() != row[1]:
+        logger.error(f"Контрольная сумма снимка {key} не совпадает.")
+        raise ValueError(f"Снимок {key} повреждён: контрольная сумма не совпадает")
+    return data.decode("utf-8")
+
+
+def snapshot_months(db_path: str = PATH_TO_SNAPSHOTS) -> list[str]:
+    """Возвращает месяцы, для которых построены снимки."""
+    if not os.path.exists(db_path):
+        return []
+    connection = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in connection.execute("SELECT month FROM months ORDER BY month")]
+    finally:
+        connection.close()
+
+
+def cashback_snapshot(year: str, month: str, db_path: str = PATH_TO_SNAPSHOTS) -> Optional[str]:
+    """Снимок get_high_cashback_categories за месяц или None, если снимка нет."""
+    return read_snapshot(cashback_key(f"{year}-{month}"), db_path)
+
+
+def spending_snapshot(category: str, year: str, month: str, db_path: str = PATH_TO_SNAPSHOTS) -> Optional[str]:
+    """ Снимок spending_by_category на конец месяца. Для месяца со снимками, но без трат по категории
+    возвращается пустой отчёт, как у spending_by_category; для месяца без снимков — None."""
+    report = read_snapshot(spending_key(f"{year}-{month}", category), db_path)
+    if report is None and f"{year}-{month}" in snapshot_months(db_path):
+        return json.dumps({category: []}, ensure_ascii=False, indent=4)
+    return report
+
+
+def export_snapshots(keys: Iterable[str], output_dir: str, db_path: str = PATH_TO_SNAPSHOTS) -> list[str]:
+    """ Выгружает снимки в отдельные файлы .json.gz для раздачи статикой.
+    Args: keys (Iterable[str]): Ключи снимков.
+          output_dir (str): Каталог выгрузки (ключ становится относительным путём файла).
+          db_path (str): Путь к файлу хранилища снимков.
+    Returns: list[str]: Пути записанных файлов."""
+
+    paths = []
+    for key in keys:
+        report = read_snapshot(key, db_path)
+        if report is None:
+            continue
+        path = os.path.join(output_dir, *key.split("/")) + ".json.gz"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.write(report)
+        paths.append(path)
+    return paths
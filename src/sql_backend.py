@@ -0,0 +1,285 @@
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
+import pandas as pd
+
+from src.cards import NO_CARD, STANDARD_CASHBACK_RATE
+from src.currency import convert_operations
+from src.ingest import read_operations
+from src.reports import spending_by_category_date_range
+from src.services import EXCLUDED_CATEGORIES
+
+PATH_TO_DATABASE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "operations.sqlite")
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля sql_backend."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "sql_backend.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Столбцы таблицы operations и соответствующие им столбцы выгрузки
+SQL_COLUMNS = {
+    "op_date": "Дата операции",
+    "card": "Номер карты",
+    "status": "Статус",
+    "amount": "Сумма платежа",
+    "rounded": "Сумма операции с округлением",
+    "category": "Категория",
+    "description": "Описание",
+}
+
+# Суммы складываются в целых копейках: результат не зависит от порядка сложения строк.
+# TOTAL, в отличие от SUM, для группы из одних NULL возвращает 0.0, как и суммирование в pandas
+SUM_ROUNDED = "TOTAL(ROUND(rounded * 100)) / 100.0"
+
+# Даты хранятся строками ISO, поэтому сравниваются лексикографически и используют индекс
+SCHEMA = """
+CREATE TABLE operations (
+    row_id INTEGER PRIMARY KEY,
+    op_date TEXT,
+    card TEXT,
+    status TEXT,
+    amount REAL,
+    rounded REAL,
+    category TEXT,
+    description TEXT
+);
+CREATE INDEX operations_date ON operations (op_date);
+CREATE INDEX operations_category_date ON operations (category, op_date);
+CREATE INDEX operations_card_date ON operations (card, op_date);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _format_date(value: Optional[Union[str, datetime]]) -> Optional[str]:
+    if value is None:
+        return None
+    return pd.Timestamp(value).strftime(DATE_FORMAT)
+
+
+def build_database(df: pd.DataFrame, db_path: str = PATH_TO_DATABASE, source: Optional[str] = None) -> int:
+    """ Загружает операции в файл SQLite с индексами по дате, категории и карте.
+    Args: df (pandas.DataFrame): Операции (отсутствующие столбцы таблицы заполняются NULL).
+          db_path (str): Путь к файлу базы (пересоздаётся).
+          source (str): Путь к исходному файлу — по его времени изменения проверяется актуальность базы.
+    Returns: int: Количество загруженных строк."""
+
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    table = pd.DataFrame(index=df.index)
+    for column, source_column in SQL_COLUMNS.items():
+        values = df[source_column] if source_column in df.columns else pd.Series(None, index=df.index, dtype=object)
+        table[column] = values
+    table["op_date"] = pd.to_datetime(table["op_date"], dayfirst=True, errors="coerce").dt.strftime(DATE_FORMAT)
+    table["card"] = table["card"].fillna(NO_CARD)
+    table = table.astype(object).where(table.notna(), None)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        with connection:
+            connection.executemany(
+                f"INSERT INTO operations (row_id, {', '.join(SQL_COLUMNS)}) "
+                f"VALUES ({', '.join(['?'] * (len(SQL_COLUMNS) + 1))})",
+                zip(range(len(table)), *(table[column].tolist() for column in SQL_COLUMNS)),
+            )
+            connection.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("source", os.path.abspath(source) if source else ""),
+                    ("source_mtime", repr(os.path.getmtime(source)) if source else ""),
+                ],
+            )
+        connection.execute("ANALYZE")
+    finally:
+        connection.close()
+    # База подменяется целиком, чтобы читатели не увидели недостроенную таблицу
+    os.replace(tmp_path, db_path)
+    logger.info(f"Построена база {db_path}: {len(table)} строк.")
+    return len(table)
+
+
+def is_database_fresh(db_path: str, source: str) -> bool:
+    """Проверяет, построена ли база по текущей версии исходного файла."""
+    if not os.path.exists(db_path):
+        return False
+    connection = sqlite3.connect(db_path)
+    try:
+        meta = dict(connection.execute("SELECT key, value FROM meta").fetchall())
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        connection.close()
+    return meta.get("source") == os.path.abspath(source) and meta.get("source_mtime") == repr(os.path.getmtime(source))
+
+
+def load_database(source: str, db_path: str = PATH_TO_DATABASE, engine: str = "auto") -> str:
+    """ Возвращает путь к базе, перестраивая её из выгрузки, если исходный файл изменился.
+    Суммы пересчитываются в базовую валюту при загрузке, как и в хранилище storage.py."""
+    if not is_database_fresh(db_path, source):
+        logger.info(f"База {db_path} устарела или отсутствует, выполняется перестроение.")
+        build_database(convert_operations(read_operations(source, engine=engine)), db_path, source=source)
+    return db_path
+
+
+def query(sql: str, params: Sequence = (), db_path: str = PATH_TO_DATABASE) -> pd.DataFrame:
+    """ Выполняет произвольный запрос к таблице operations.
+    Args: sql (str): Текст запроса с параметрами "?".
+          params (Sequence): Значения параметров.
+          db_path (str): Путь к файлу базы.
+    Returns: pandas.DataFrame: Результат запроса."""
+    connection = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(sql, connection, params=list(params))
+    finally:
+        connection.close()
+
+
+def _fetch(sql: str, params: Sequence, db_path: str) -> list[tuple]:
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute(sql, list(params)).fetchall()
+    finally:
+        connection.close()
+
+
+def spending_by_category_sql(
+        category: str,
+        start_date: Optional[Union[str, datetime]] = None,
+        db_path: str = PATH_TO_DATABASE
+) -> str:
+    """ SQL-вариант reports.spending_by_category: расходы по категории за 3 месяца до заданной даты.
+    Args: category (str): Название категории.
+          start_date: Строка в формате 'ДД.ММ.ГГГГ' или datetime (по умолчанию текущая дата).
+          db_path (str): Путь к файлу базы.
+    Returns: str: JSON-строка в формате spending_by_category."""
+
+    try:
+        end_dt, start_dt = spending_by_category_date_range(start_date)
+
+        rows = _fetch(
+            "SELECT op_date, amount, description FROM operations "
+            "WHERE category = ? AND op_date BETWEEN ? AND ? AND amount < 0 ORDER BY row_id",
+            (category, _format_date(end_dt), _format_date(start_dt)),
+            db_path,
+        )
+        result = [
+            {"Дата операции": op_date[:10], "Сумма платежа": round(amount, 2), "Описание": description}
+            for op_date, amount, description in rows
+        ]
+        logger.info(f"Получены траты по категории '{category}' — {len(result)} записей.")
+        return json.dumps({category: result}, ensure_ascii=False, indent=4)
+
+    except Exception as e:
+        logger.error(f"Ошибка в функции spending_by_category_sql: {e}")
+        return json.dumps({"error": str(e)}, ensure_ascii=False, indent=4)
+
+
+def high_cashback_categories_sql(year: str, month: str, db_path: str = PATH_TO_DATABASE) -> str:
+    """ SQL-вариант services.get_high_cashback_categories: расходы и кешбэк по категориям за месяц.
+    Args: year (str): Год в формате YYYY.
+          month (str): Месяц в формате MM.
+          db_path (str): Путь к файлу базы.
+    Returns: str: JSON-строка в формате get_high_cashback_categories."""
+
+    try:
+        try:
+            period = pd.Period(year=int(year), month=int(month), freq="M")
+        except ValueError:
+            logger.error(f"Ошибка при преобразовании года ({year}) или месяца ({month}) в число")
+            return json.dumps({"error": "Некорректный формат года или месяца"}, ensure_ascii=False)
+        bounds = (period.start_time.strftime(DATE_FORMAT), (period + 1).start_time.strftime(DATE_FORMAT))
+
+        (month_rows,) = _fetch(
+            "SELECT COUNT(*) FROM operations WHERE op_date >= ? AND op_date < ?", bounds, db_path
+        )[0]
+        if month_rows == 0:
+            logger.info(f"Нет данных за месяц {month} (год {year}).")
+            return json.dumps({"info": f"Нет данных за месяц {month} (год {year})"}, ensure_ascii=False)
+
+        placeholders = ", ".join(["?"] * len(EXCLUDED_CATEGORIES))
+        rows = _fetch(
+            f"SELECT category, {SUM_ROUNDED} AS total FROM operations "
+            "WHERE op_date >= ? AND op_date < ? AND amount < 0 "
+            f"AND category IS NOT NULL AND category NOT IN ({placeholders}) "
+            "GROUP BY category ORDER BY total DESC, category",
+            (*bounds, *EXCLUDED_CATEGORIES),
+            db_path,
+        )
+        if not rows:
+            logger.info(f"Нет расходов за месяц {month} (год {year}).")
+            return json.dumps({"info": f"Нет расходов за месяц {month} (год {year})"}, ensure_ascii=False)
+
+        result = {"period": f"{year}-{month}", "cashback_analysis": {}}
+        for category, total in rows:
+            spent_amount = abs(total)
+            result["cashback_analysis"][category] = {
+                "total_spent": float(spent_amount),
+                "cashback_rate": float(STANDARD_CASHBACK_RATE),
+                "potential_cashback": float(round(spent_amount * STANDARD_CASHBACK_RATE, 2)),
+            }
+        return json.dumps(result, indent=4, ensure_ascii=False)
+
+    except Exception as e:
+        logger.error(f"Произошла ошибка при анализе данных: {str(e)}")
+        return json.dumps({"error": f"Произошла ошибка при анализе данных: {str(e)}"}, ensure_ascii=False)
+
+
+def summary_card_data_sql(
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        db_path: str = PATH_TO_DATABASE
+) -> list[dict]:
+    """ SQL-вариант utils.get_summary_card_data для операций за период.
+    Args: start_date, end_date (datetime): Границы диапазона дат включительно (по умолчанию без ограничений).
+          db_path (str): Путь к файлу базы.
+    Returns: list[dict]: Сводка по картам в формате get_summary_card_data."""
+
+    conditions, params = ["amount < 0"], []
+    if start_date is not None:
+        conditions.append("op_date >= ?")
+        params.append(_format_date(start_date))
+    if end_date is not None:
+        conditions.append("op_date <= ?")
+        params.append(_format_date(end_date))
+    rows = _fetch(
+        f"SELECT card, {SUM_ROUNDED} FROM operations WHERE {' AND '.join(conditions)} GROUP BY card ORDER BY card",
+        params,
+        db_path,
+    )
+    result = [
+        {
+            "last_digits": card.replace("*", ""),
+            "total_spent": round(total, 2),
+            "cashback": round(total * STANDARD_CASHBACK_RATE, 2),
+        }
+        for card, total in rows
+    ]
+    logger.debug("Сводная информация по каждой карте успешно получена.")
+    return result
@@ -0,0 +1,394 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.cards import (
+    NO_CARD,
+    build_card_dimension,
+    card_summary_records,
+    dimension_from_numbers,
+    merge_card_summaries,
+    partial_card_summary,
+)
+from src.currency import BASE_CURRENCY, convert_operations
+from src.ingest import read_operations
+from src.search import DescriptionIndex, build_search_index
+
+
+def setup_logger() -> logging.Logger:
+    """Настраивает логгер для модуля storage."""
+    logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "storage.log")
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.DEBUG)
+
+    if not logger.handlers:
+        file_handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(filename)s - %(funcName)s - %(levelname)s: %(message)s"
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+logger = setup_logger()
+
+DATE_COLUMN = "Дата операции"
+MANIFEST_NAME = "manifest.json"
+PARTITIONS_DIR = "partitions"
+SEARCH_INDEX_NAME = "search_index.pkl"
+CARD_COLUMNS = ["Номер карты", "Сумма платежа", "Сумма операции с округлением"]
+
+# Партиция для операций, дату которых не удалось разобрать
+UNDATED_PARTITION = "undated"
+
+# Перестроение хранилища из параллельных потоков (асинхронный API) выполняется один раз
+_rebuild_lock = threading.Lock()
+
+
+def _partition_dir(store_dir: str, name: str) -> str:
+    return os.path.join(store_dir, PARTITIONS_DIR, name)
+
+
+def load_manifest(store_dir: str) -> Optional[dict]:
+    """Читает манифест хранилища или возвращает None, если хранилища нет."""
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_manifest(store_dir: str, manifest: dict) -> None:
+    """Атомарно записывает манифест хранилища."""
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, manifest_path)
+
+
+def _is_store_dir(store_dir: str) -> bool:
+    """Каталог можно занять под хранилище: его нет, он пуст или в нём уже есть манифест хранилища."""
+    if not os.path.isdir(store_dir):
+        return not os.path.exists(store_dir)
+    return not os.listdir(store_dir) or os.path.isfile(os.path.join(store_dir, MANIFEST_NAME))
+
+
+def _replace_store(tmp_dir: str, store_dir: str) -> None:
+    """ Переносит построенное хранилище из временного каталога на место старого.
+    Удаляются только файлы, принадлежащие хранилищу, остальное содержимое каталога не затрагивается."""
+    os.makedirs(store_dir, exist_ok=True)
+    old_manifest = load_manifest(store_dir)
+    if old_manifest is not None:
+        # Пока партиции подменяются, старый манифест не должен считаться актуальным
+        save_manifest(store_dir, {**old_manifest, "source": None, "source_mtime": None, "partitions": []})
+    for name in (PARTITIONS_DIR, SEARCH_INDEX_NAME):
+        target = os.path.join(store_dir, name)
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        elif os.path.exists(target):
+            os.remove(target)
+        if os.path.exists(os.path.join(tmp_dir, name)):
+            os.replace(os.path.join(tmp_dir, name), target)
+    os.replace(os.path.join(tmp_dir, MANIFEST_NAME), os.path.join(store_dir, MANIFEST_NAME))
+    os.rmdir(tmp_dir)
+
+
+def _has_card_columns(columns: list[str]) -> bool:
+    return all(column in columns for column in CARD_COLUMNS)
+
+
+def _card_dimension(manifest: dict) -> pd.DataFrame:
+    # Порядок карт в манифесте задаёт их коды в сохранённых сводках, поэтому заново не сортируется
+    return dimension_from_numbers(pd.Index(manifest["cards"], dtype=object))
+
+
+def _write_partition(
+        store_dir: str,
+        name: str,
+        part: pd.DataFrame,
+        columns: list[str],
+        dimension: Optional[pd.DataFrame]
+) -> dict:
+    """Записывает партицию по столбцам и возвращает её описание для манифеста."""
+    partition_dir = _partition_dir(store_dir, name)
+    os.makedirs(partition_dir, exist_ok=True)
+    for index, column in enumerate(columns):
+        part[column].reset_index(drop=True).to_pickle(os.path.join(partition_dir, f"{index}.pkl"))
+    dates = part[DATE_COLUMN]
+    partition = {
+        "name": name,
+        "rows": len(part),
+        "min_date": None if dates.isna().all() else dates.min().isoformat(),
+        "max_date": None if dates.isna().all() else dates.max().isoformat(),
+    }
+    if dimension is not None:
+        # Частичная сводка по картам позволяет не перечитывать строки партиции, целиком попавшей в диапазон
+        cards_df = part[CARD_COLUMNS].fillna({"Номер карты": NO_CARD})
+        partition["card_summary"] = partial_card_summary(cards_df, dimension).tolist()
+    return partition
+
+
+def build_partition_store(df: pd.DataFrame, store_dir: str, source: Optional[str] = None) -> dict:
+    """ Сохраняет операции в хранилище, разбитое на помесячные партиции с отдельным файлом на каждый столбец.
+    Args: df (pandas.DataFrame): Таблица операций.
+          store_dir (str): Каталог хранилища: пустой или ранее построенное хранилище (его файлы заменяются).
+          source (str): Путь к исходному файлу — по его времени изменения проверяется актуальность хранилища.
+    Returns: dict: Манифест хранилища со статистикой min/max даты по каждой партиции."""
+
+    if not _is_store_dir(store_dir):
+        raise ValueError(f"Каталог {store_dir} не пуст и не является хранилищем операций")
+    # Хранилище строится во временном каталоге и подменяет старое только после полной записи
+    tmp_dir = f"{os.path.normpath(store_dir)}.tmp"
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(os.path.join(tmp_dir, PARTITIONS_DIR))
+
+    df = df.copy()
+    if DATE_COLUMN not in df.columns:
+        df[DATE_COLUMN] = pd.Series(dtype="datetime64[ns]")
+    df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN], dayfirst=True, errors="coerce")
+    keys = df[DATE_COLUMN].dt.strftime("%Y-%m").fillna(UNDATED_PARTITION)
+
+    columns = list(df.columns)
+    dimension = None
+    if _has_card_columns(columns):
+        dimension = build_card_dimension(df["Номер карты"].fillna(NO_CARD))
+    partitions = [
+        _write_partition(tmp_dir, str(name), part, columns, dimension)
+        for name, part in df.groupby(keys, sort=True)
+    ]
+
+    manifest = {
+        "source": os.path.abspath(source) if source else None,
+        "source_mtime": os.path.getmtime(source) if source else None,
+        "columns": columns,
+        "base_currency": BASE_CURRENCY,
+        "partitions": partitions,
+    }
+    if dimension is not None:
+        manifest["cards"] = dimension["Номер карты"].tolist()
+    if "Описание" in columns:
+        pd.to_pickle(build_search_index(df), os.path.join(tmp_dir, SEARCH_INDEX_NAME))
+    save_manifest(tmp_dir, manifest)
+    _replace_store(tmp_dir, store_dir)
+    logger.info(f"Построено хранилище {store_dir}: {len(df)} строк в {len(partitions)} партициях.")
+    return manifest
+
+
+def is_store_fresh(store_dir: str, source: str) -> bool:
+    """ Проверяет, построено ли хранилище по текущей версии исходного файла и в текущей базовой валюте
+    (хранилища без пересчёта валют, построенные до его появления, перестраиваются)."""
+    manifest = load_manifest(store_dir)
+    return (
+        manifest is not None
+        and manifest.get("source") == os.path.abspath(source)
+        and manifest.get("source_mtime") == os.path.getmtime(source)
+        and manifest.get("base_currency") == BASE_CURRENCY
+    )
+
+
+def read_partition_store(
+        store_dir: str,
+        columns: Optional[Sequence[str]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+) -> pd.DataFrame:
+    """ Читает из хранилища только нужные столбцы и только партиции, пересекающиеся с диапазоном дат.
+    Args: store_dir (str): Каталог хранилища.
+          columns (Sequence[str]): Столбцы для чтения (по умолчанию все).
+          start_date, end_date (datetime): Границы диапазона дат включительно (по умолчанию без ограничений).
+    Returns: pandas.DataFrame: Операции в исходном порядке столбцов."""
+
+    manifest = load_manifest(store_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"Хранилище {store_dir} не найдено")
+
+    all_columns = manifest["columns"]
+    wanted = all_columns if columns is None else [column for column in all_columns if column in columns]
+    missing = set(columns or []) - set(all_columns)
+    if missing:
+        raise ValueError(f"В хранилище отсутствуют столбцы: {', '.join(sorted(missing))}")
+
+    filter_by_date = start_date is not None or end_date is not None
+    # Дата нужна для точной фильтрации строк внутри граничных партиций
+    read_columns = wanted if not filter_by_date or DATE_COLUMN in wanted else wanted + [DATE_COLUMN]
+
+    frames = []
+    skipped = 0
+    for partition in manifest["partitions"]:
+        if filter_by_date:
+            if partition["min_date"] is None:
+                skipped += 1
+                continue
+            if start_date is not None and pd.Timestamp(partition["max_date"]) < pd.Timestamp(start_date):
+                skipped += 1
+                continue
+            if end_date is not None and pd.Timestamp(partition["min_date"]) > pd.Timestamp(end_date):
+                skipped += 1
+                continue
+        partition_dir = _partition_dir(store_dir, partition["name"])
+        frames.append(
+            pd.DataFrame(
+                {
+                    column: pd.read_pickle(os.path.join(partition_dir, f"{all_columns.index(column)}.pkl"))
+                    for column in read_columns
+                }
+            )
+        )
+    logger.debug(f"Прочитано партиций: {len(frames)}, пропущено по диапазону дат: {skipped}.")
+
+    if not frames:
+        return pd.DataFrame(columns=wanted)
+    df = pd.concat(frames, ignore_index=True)
+    if filter_by_date:
+        mask = df[DATE_COLUMN].notna()
+        if start_date is not None:
+            mask &= df[DATE_COLUMN] >= pd.Timestamp(start_date)
+        if end_date is not None:
+            mask &= df[DATE_COLUMN] <= pd.Timestamp(end_date)
+        df = df[mask].reset_index(drop=True)
+    return df[wanted]
+
+
+def load_operations(
+        source: str,
+        store_dir: str,
+        columns: Optional[Sequence[str]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        engine: str = "auto"
+) -> pd.DataFrame:
+    """ Читает операции через хранилище, перестраивая его, если исходный файл изменился.
+    Args: source (str): Путь к исходной выгрузке.
+          store_dir (str): Каталог хранилища.
+          columns (Sequence[str]): Столбцы для чтения.
+          start_date, end_date (datetime): Границы диапазона дат включительно.
+          engine (str): Движок чтения исходного файла при перестроении хранилища.
+    Returns: pandas.DataFrame: Операции с суммами в базовой валюте."""
+
+    if not is_store_fresh(store_dir, source):
+        with _rebuild_lock:
+            if not is_store_fresh(store_dir, source):
+                logger.info(f"Хранилище {store_dir} устарело или отсутствует, выполняется перестроение.")
+                # Суммы пересчитываются в базовую валюту один раз и хранятся в партициях уже пересчитанными
+                df = convert_operations(read_operations(source, engine=engine))
+                build_partition_store(df, store_dir, source=source)
+    return read_partition_store(store_dir, columns=columns, start_date=start_date, end_date=end_date)
+
+
+def append_to_partition_store(df: pd.DataFrame, store_dir: str) -> dict:
+    """ Дописывает новые операции в хранилище: перезаписываются только затронутые партиции,
+    индекс по описаниям дополняется новыми строками.
+    Args: df (pandas.DataFrame): Новые операции с теми же столбцами, что и в хранилище.
+          store_dir (str): Каталог хранилища.
+    Returns: dict: Обновлённый манифест."""
+
+    manifest = load_manifest(store_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"Хранилище {store_dir} не найдено")
+    columns = manifest["columns"]
+    missing = set(columns) - set(df.columns)
+    if missing:
+        raise ValueError(f"В новых операциях отсутствуют столбцы: {', '.join(sorted(missing))}")
+    if df.empty:
+        return manifest
+
+    df = df[columns].copy()
+    df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN], dayfirst=True, errors="coerce")
+    keys = df[DATE_COLUMN].dt.strftime("%Y-%m").fillna(UNDATED_PARTITION)
+
+    dimension = None
+    if _has_card_columns(columns):
+        dimension = build_card_dimension(df["Номер карты"].fillna(NO_CARD), _card_dimension(manifest))
+        manifest["cards"] = dimension["Номер карты"].tolist()
+
+    partitions = {partition["name"]: partition for partition in manifest["partitions"]}
+    for name, part in df.groupby(keys, sort=True):
+        if name in partitions:
+            partition_dir = _partition_dir(store_dir, str(name))
+            existing = pd.DataFrame(
+                {
+                    column: pd.read_pickle(os.path.join(partition_dir, f"{index}.pkl"))
+                    for index, column in enumerate(columns)
+                }
+            )
+            part = pd.concat([existing, part], ignore_index=True)
+        partitions[str(name)] = _write_partition(store_dir, str(name), part, columns, dimension)
+
+    manifest["partitions"] = [partitions[name] for name in sorted(partitions)]
+    if "Описание" in columns:
+        index = load_search_index(store_dir) or DescriptionIndex()
+        index.append(df)
+        pd.to_pickle(index, os.path.join(store_dir, SEARCH_INDEX_NAME))
+    save_manifest(store_dir, manifest)
+    logger.info(f"В хранилище {store_dir} добавлено {len(df)} строк.")
+    return manifest
+
+
+def load_search_index(store_dir: str) -> Optional[DescriptionIndex]:
+    """Загружает индекс по описаниям, построенный вместе с хранилищем."""
+    path = os.path.join(store_dir, SEARCH_INDEX_NAME)
+    if not os.path.exists(path):
+        return None
+    return pd.read_pickle(path)
+
+
+def card_summary_from_store(
+        store_dir: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+) -> list[dict]:
+    """ Сводка по картам за период: партиции, целиком попавшие в диапазон, берутся из готовых частичных сводок,
+    строки читаются только для граничных партиций.
+    Args: store_dir (str): Каталог хранилища.
+          start_date, end_date (datetime): Границы диапазона дат включительно.
+    Returns: list[dict]: Сводка в формате utils.get_summary_card_data."""
+
+    manifest = load_manifest(store_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"Хранилище {store_dir} не найдено")
+    if "cards" not in manifest:
+        raise ValueError(f"В хранилище {store_dir} нет столбцов для сводки по картам")
+    dimension = _card_dimension(manifest)
+    start = pd.Timestamp(start_date) if start_date is not None else None
+    end = pd.Timestamp(end_date) if end_date is not None else None
+
+    partials = []
+    boundary = []
+    for partition in manifest["partitions"]:
+        if start is None and end is None:
+            partials.append(np.array(partition["card_summary"]))
+            continue
+        if partition["min_date"] is None:
+            continue
+        min_date, max_date = pd.Timestamp(partition["min_date"]), pd.Timestamp(partition["max_date"])
+        if (start is not None and max_date < start) or (end is not None and min_date > end):
+            continue
+        if (start is None or min_date >= start) and (end is None or max_date <= end):
+            partials.append(np.array(partition["card_summary"]))
+        else:
+            boundary.append(partition)
+
+    for partition in boundary:
+        part = read_partition_store(
+            store_dir, CARD_COLUMNS, max(start, pd.Timestamp(partition["min_date"])) if start is not None else None,
+            min(end, pd.Timestamp(partition["max_date"])) if end is not None else None,
+        )
+        partials.append(partial_card_summary(part.fillna({"Номер карты": NO_CARD}), dimension))
+
+    logger.debug(f"Сводка по картам: {len(partials) - len(boundary)} готовых партиций, {len(boundary)} граничных.")
+    return card_summary_records(merge_card_summaries(partials, len(dimension)), dimension)
@@ -2,13 +2,23 @@ import json
 import logging
 import os
 from datetime import datetime
+from typing import Optional, Sequence
 
 import pandas as pd
 import requests
 from dotenv import load_dotenv
 
-PATH_TO_EXCEL = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "operations.xlsx")
+from src.cards import NO_CARD, card_summary_records, card_totals, factorize_cards
+from src.currency import CONVERTED_COLUMNS, CURRENCY_SOURCE_COLUMNS, PATH_TO_RATES, convert_operations
+from src.ingest import read_operations
+from src.profiling import record_rows
+from src.storage import load_operations
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+PATH_TO_EXCEL = os.path.join(PROJECT_ROOT, "data", "operations.xlsx")
 PATH_TO_USER_SETTINGS_JSON = os.path.join(os.path.dirname(os.path.dirname(__file__)), "user_settings.json")
+CURRENCIES_URL = "https://api.apilayer.com/exchangerates_data/latest"
+STOCKS_URL = "http://api.marketstack.com/v1/eod/latest"
 
 
 def setup_logger() -> logging.Logger:
@@ -32,6 +42,10 @@ def setup_logger() -> logging.Logger:
 
 logger = setup_logger()
 
+# Столбцы, которые читают функции сводки по картам и ТОП-5 транзакций
+SUMMARY_CARD_COLUMNS = ["Номер карты", "Сумма платежа", "Сумма операции с округлением"]
+TOP_TRANSACTIONS_COLUMNS = ["Дата операции", "Статус", "Сумма операции с округлением", "Категория", "Описание"]
+
 
 def get_date_range(date_time: str) -> tuple[datetime, datetime]:
     end_date = datetime.strptime(date_time, "%Y-%m-%d %H:%M:%S")
@@ -40,18 +54,93 @@ def get_date_range(date_time: str) -> tuple[datetime, datetime]:
     return start_date, end_date
 
 
-def read_data_file() -> pd.DataFrame:
-    df_excel = pd.read_excel(PATH_TO_EXCEL, sheet_name="Отчет по операциям")
+# Пересчитанные в базовую валюту выгрузки для чтения без хранилища:
+# (файл, движок, столбцы) -> (версия файла и таблицы курсов, таблица)
+_converted_cache: dict[tuple, tuple[tuple, pd.DataFrame]] = {}
+
+
+def _file_version(path: str) -> Optional[float]:
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def read_converted_operations(
+        source: str,
+        engine: str = "auto",
+        columns: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """ Читает выгрузку и пересчитывает суммы в базовую валюту. Результат пересчёта запоминается и
+    используется повторно, пока не изменятся исходный файл или таблица курсов, поэтому курсы
+    (и запрос к провайдеру при их нехватке) запрашиваются один раз на версию выгрузки.
+    Args: source (str): Путь к выгрузке.
+          engine (str): Движок чтения.
+          columns (Sequence[str]): Столбцы для чтения (по умолчанию все).
+    Returns: pandas.DataFrame: Копия пересчитанной таблицы."""
+
+    key = (os.path.abspath(source), engine, None if columns is None else tuple(columns))
+    version = (_file_version(source), _file_version(PATH_TO_RATES))
+    cached = _converted_cache.get(key)
+    if cached is not None and version[0] is not None and cached[0] == version:
+        return cached[1].copy()
+
+    df = convert_operations(read_operations(source, engine=engine, columns=columns))
+    # Версия берётся после пересчёта: догруженные при нём курсы не вызывают повторного пересчёта
+    _converted_cache[key] = ((_file_version(source), _file_version(PATH_TO_RATES)), df)
+    return df.copy()
+
+
+def read_data_file(
+        path: Optional[str] = None,
+        engine: str = "auto",
+        columns: Optional[Sequence[str]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+) -> pd.DataFrame:
+    source = path or PATH_TO_EXCEL
+    # Дата нужна для фильтрации по диапазону, даже если вызывающий её не запросил
+    read_columns = None
+    if columns is not None:
+        read_columns = list(columns)
+        if (start_date is not None or end_date is not None) and "Дата операции" not in read_columns:
+            read_columns.append("Дата операции")
+
+    load_dotenv()
+    store_dir = os.getenv("OPERATIONS_CACHE_DIR")
+    if store_dir:
+        store_dir = os.path.join(PROJECT_ROOT, store_dir)
+        df_excel = load_operations(source, store_dir, read_columns, start_date, end_date, engine=engine)
+    else:
+        # Для пересчёта сумм в базовую валюту нужны валюты и суммы операции
+        source_columns = read_columns
+        if read_columns is not None and any(column in read_columns for column in CONVERTED_COLUMNS):
+            source_columns = list(dict.fromkeys(read_columns + CURRENCY_SOURCE_COLUMNS))
+        df_excel = read_converted_operations(source, engine=engine, columns=source_columns)
+        if source_columns != read_columns and not df_excel.empty:
+            df_excel = df_excel[read_columns].copy()
+        if not df_excel.empty and (start_date is not None or end_date is not None):
+            df_excel["Дата операции"] = pd.to_datetime(df_excel["Дата операции"], dayfirst=True, errors="coerce")
+            mask = df_excel["Дата операции"].notna()
+            if start_date is not None:
+                mask &= df_excel["Дата операции"] >= start_date
+            if end_date is not None:
+                mask &= df_excel["Дата операции"] <= end_date
+            df_excel = df_excel[mask].reset_index(drop=True)
+
     if df_excel.empty:
         print("Ошибка. Данные для анализа не обнаружены.")
         return pd.DataFrame()
-    df_excel["Номер карты"] = df_excel["Номер карты"].fillna("Карта не указана")
-    logger.debug(f"Выполнено чтение файла {PATH_TO_EXCEL}.")
+    if "Номер карты" in df_excel.columns:
+        df_excel["Номер карты"] = df_excel["Номер карты"].fillna(NO_CARD)
+    record_rows(len(df_excel))
+    logger.debug(f"Выполнено чтение файла {source}: {len(df_excel)} строк, {len(df_excel.columns)} столбцов.")
     return df_excel
 
 
-def get_slice_of_data(start_date: datetime, end_date: datetime) -> pd.DataFrame:
-    df = read_data_file()
+def get_slice_of_data(
+        start_date: datetime,
+        end_date: datetime,
+        columns: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    df = read_data_file(columns=columns, start_date=start_date, end_date=end_date)
     if df.empty:
         print("Ошибка. Данные для анализа не обнаружены.")
         return pd.DataFrame()
@@ -79,18 +168,9 @@ def get_summary_card_data(df: pd.DataFrame) -> list[dict]:
         print("Ошибка. Данные для анализа не обнаружены.")
         return []
     spent_df = df[df["Сумма платежа"] < 0]
-    card_grouped = spent_df.groupby(by="Номер карты", as_index=False)
-    cards_sum = card_grouped["Сумма операции с округлением"].sum()
-
-    result = []
-    for _, row in cards_sum.iterrows():
-        result.append(
-            {
-                "last_digits": row["Номер карты"].replace("*", ""),
-                "total_spent": round(row["Сумма операции с округлением"], 2),
-                "cashback": round(row["Сумма операции с округлением"] * 0.01, 2)
-            }
-        )
+    codes, dimension = factorize_cards(spent_df["Номер карты"])
+    summary = card_totals(codes, spent_df["Сумма операции с округлением"].to_numpy(dtype=float), len(dimension))
+    result = card_summary_records(summary, dimension)
     logger.debug("Сводная информация по каждой карте успешно получена.")
     return result
 
@@ -122,36 +202,44 @@ def top_5_transactions_by_sum(df: pd.DataFrame) -> list[dict]:
     return result
 
 
-def actual_currencies(base_currency: str = "RUB") -> list[dict]:
+def read_user_settings(key: str) -> Optional[list]:
+    """ Читает список из файла пользовательских настроек.
+    Args: key (str): Ключ настроек, например "user_currencies".
+    Returns: list | None: Значения настройки или None, если файл не найден или повреждён."""
     try:
         logger.debug("Чтение данных из JSON-файла...")
         with open(PATH_TO_USER_SETTINGS_JSON, "r") as file:
-            currencies = json.load(file)["user_currencies"]
+            values = json.load(file)[key]
             logger.debug("Данные из JSON-файла успешно получены.")
+            return values
     except json.JSONDecodeError:
         print("Ошибка декодирования файла.")
         logger.error("Произошла ошибка декодирования файла.")
-        return []
+        return None
     except FileNotFoundError:
         print(f"Ошибка! Файл по адресу {PATH_TO_USER_SETTINGS_JSON} не найден.")
         logger.error(f"Ошибка! Файл по адресу {PATH_TO_USER_SETTINGS_JSON} не найден.")
-        return []
+        return None
 
-    url = "https://api.apilayer.com/exchangerates_data/latest"
+
+def currencies_request(currencies: list[str], base_currency: str = "RUB") -> tuple[dict, dict]:
+    """Возвращает параметры и заголовки запроса актуальных курсов валют."""
+    load_dotenv()
     payload = {"symbols": ",".join(currencies), "base": base_currency}
+    headers = {"apikey": os.getenv("API_KEY_APILAYER")}
+    return payload, headers
 
+
+def stocks_request(symbols: list[str]) -> tuple[dict, dict]:
+    """Возвращает параметры и заголовки запроса курсов акций."""
     load_dotenv()
-    api_key = os.getenv("API_KEY_APILAYER")
-    headers = {"apikey": api_key}
+    payload = {"symbols": ",".join(symbols)}
+    headers = {"access_key": os.getenv("API_KEY_MARKETSTACK")}
+    return payload, headers
 
-    response = requests.get(url, headers=headers, params=payload)
-    if response.status_code != 200:
-        print(f"Неудачная попытка получить курс валют {currencies}. Возможная причина: {response.reason}.")
-        logger.error(f"Неудачная попытка получить курсы валют {currencies}. Возможная причина: {response.reason}.")
-        return []
-    response_json = response.json()
-    logger.debug(f"Курсы валют {currencies} по API-запросу успешно получены. Выполняется обработка данных.")
 
+def parse_currency_rates(response_json: dict) -> list[dict]:
+    """Переводит ответ API курсов валют в стоимость единицы валюты в базовой валюте."""
     result = []
     for key, value in response_json["rates"].items():
         result.append(
@@ -163,42 +251,46 @@ def actual_currencies(base_currency: str = "RUB") -> list[dict]:
     return result
 
 
-def actual_stocks() -> list[dict]:
-    try:
-        logger.debug("Чтение данных из JSON-файла...")
-        with open(PATH_TO_USER_SETTINGS_JSON, "r") as file:
-            symbols = json.load(file)["user_stocks"]
-            logger.info("Данные из JSON-файла успешно получены.")
-    except json.JSONDecodeError:
-        print("Ошибка декодирования файла.")
-        logger.error("Произошла ошибка декодирования файла.")
+def parse_stock_prices(response_json: dict) -> list[dict]:
+    """Извлекает цены закрытия из ответа API курсов акций."""
+    result = []
+    for stock_info in response_json["data"]:
+        result.append(
+            {
+                "stock": stock_info["symbol"],
+                "price": stock_info["adj_close"]
+            }
+        )
+    return result
+
+
+def actual_currencies(base_currency: str = "RUB") -> list[dict]:
+    currencies = read_user_settings("user_currencies")
+    if currencies is None:
         return []
-    except FileNotFoundError:
-        print(f"Ошибка! Файл по адресу {PATH_TO_USER_SETTINGS_JSON} не найден.")
-        logger.error(f"Ошибка! Файл по адресу {PATH_TO_USER_SETTINGS_JSON} не найден.")
+
+    payload, headers = currencies_request(currencies, base_currency)
+    response = requests.get(CURRENCIES_URL, headers=headers, params=payload)
+    if response.status_code != 200:
+        print(f"Неудачная попытка получить курс валют {currencies}. Возможная причина: {response.reason}.")
+        logger.error(f"Неудачная попытка получить курсы валют {currencies}. Возможная причина: {response.reason}.")
         return []
+    response_json = response.json()
+    logger.debug(f"Курсы валют {currencies} по API-запросу успешно получены. Выполняется обработка данных.")
+    return parse_currency_rates(response_json)
 
-    url = "http://api.marketstack.com/v1/eod/latest"
-    payload = {"symbols": ",".join(symbols)}
 
-    load_dotenv()
-    api_key = os.getenv("API_KEY_MARKETSTACK")
-    headers = {"access_key": api_key}
+def actual_stocks() -> list[dict]:
+    symbols = read_user_settings("user_stocks")
+    if symbols is None:
+        return []
 
-    response = requests.get(url, params=payload, headers=headers)
+    payload, headers = stocks_request(symbols)
+    response = requests.get(STOCKS_URL, params=payload, headers=headers)
     if response.status_code != 200:
         print(f"Неудачная попытка получить курсы акций {symbols}. Возможная причина: {response.reason}.")
         logger.error(f"Неудачная попытка получить курсы акций {symbols}. Возможная причина: {response.reason}.")
         return []
     response_json = response.json()
     logger.debug(f"Курсы акций {symbols} по API-запросу успешно получены. Выполняется обработка данных.")
-
-    result = []
-    for stock_info in response_json["data"]:
-        result.append(
-            {
-                "stock": stock_info["symbol"],
-                "price": stock_info["adj_close"]
-            }
-        )
-    return result
+    return parse_stock_prices(response_json)
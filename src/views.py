@@ -1,10 +1,15 @@
 import json
 import logging
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict
 
+import pandas as pd
+
+from src.anomalies import ANOMALY_COLUMNS, detect_anomalies
 from src.utils import (
+    SUMMARY_CARD_COLUMNS,
+    TOP_TRANSACTIONS_COLUMNS,
     actual_currencies,
     actual_stocks,
     get_date_range,
@@ -37,14 +42,30 @@ def setup_logger() -> logging.Logger:
 
 logger = setup_logger()
 
+# Столбцы, которые нужны блокам главной страницы
+MAIN_INFO_COLUMNS = list(dict.fromkeys(SUMMARY_CARD_COLUMNS + TOP_TRANSACTIONS_COLUMNS + ANOMALY_COLUMNS))
 
-def main_info(date_time: str) -> str:
-    """ Возвращает JSON с данными для страницы "Главная".
-    Args: date_time (str): Дата и время в формате "YYYY-MM-DD HH:MM:SS".
-    Returns: str: JSON-строка с приветствием, данными по картам, транзакциями, курсами валют и акциями"""
+# Сколько необычных операций показывать на главной странице
+ANOMALIES_LIMIT = 10
 
-    logger.debug("Запуск функции main_info")
+# Сколько дней до начала периода читается как история, с которой сравниваются операции периода
+ANOMALY_HISTORY_DAYS = 90
+
+
+def anomaly_history_start(start_date: datetime) -> datetime:
+    """Начало выборки для поиска необычных операций: период вместе с историей до него."""
+    return start_date - timedelta(days=ANOMALY_HISTORY_DAYS)
+
+
+def select_period(df: pd.DataFrame, start_date: datetime) -> pd.DataFrame:
+    """Оставляет из выборки с историей операции периода, начиная с start_date."""
+    if df.empty:
+        return df
+    return df[df["Дата операции"] >= start_date]
 
+
+def check_date_time(date_time: str) -> None:
+    """Проверяет формат даты "YYYY-MM-DD HH:MM:SS" и выбрасывает ValueError, если он неверный."""
     try:
         datetime.strptime(date_time, "%Y-%m-%d %H:%M:%S")
         logger.debug(f"Проверка формата даты прошла успешно: {date_time}")
@@ -52,16 +73,30 @@ def main_info(date_time: str) -> str:
         logger.error(f"Неверный формат даты: {date_time}")
         raise ValueError("Ожидаемый формат даты: 'YYYY-MM-DD HH:MM:SS'") from e
 
+
+def main_info(date_time: str) -> str:
+    """ Возвращает JSON с данными для страницы "Главная".
+    Args: date_time (str): Дата и время в формате "YYYY-MM-DD HH:MM:SS".
+    Returns: str: JSON-строка с приветствием, данными по картам, транзакциями, необычными операциями,
+                  курсами валют и акциями"""
+
+    logger.debug("Запуск функции main_info")
+
+    check_date_time(date_time)
+
     start_date, end_date = get_date_range(date_time)
     logger.info(f"Выбран период: {start_date} — {end_date}")
 
-    df = get_slice_of_data(start_date, end_date)
+    # Выборка читается один раз вместе с историей: по ней ищутся необычные операции периода
+    history_df = get_slice_of_data(anomaly_history_start(start_date), end_date, columns=MAIN_INFO_COLUMNS)
+    df = select_period(history_df, start_date)
     logger.info(f"Получено {len(df)} транзакций за выбранный период")
 
     data: Dict[str, object] = {
         "greeting": get_time_for_greeting(),
         "cards": get_summary_card_data(df),
         "top_transactions": top_5_transactions_by_sum(df),
+        "anomalies": detect_anomalies(history_df, limit=ANOMALIES_LIMIT, since=start_date),
         "currency_rates": actual_currencies(),
         "stock_prices": actual_stocks(),
     }
@@ -3,6 +3,17 @@ from unittest.mock import patch
 import pandas as pd
 import pytest
 
+from src import utils
+
+
+@pytest.fixture(autouse=True)
+def clear_converted_cache():
+    # Тесты подменяют чтение выгрузки — результат пересчёта из другого теста не должен переиспользоваться
+    utils._converted_cache.clear()
+    yield
+    utils._converted_cache.clear()
+
+
 @pytest.fixture
 def valid_date_str():
     return "2025-05-01 12:00:00"
@@ -15,14 +26,16 @@ def mock_dependencies():
          patch("src.views.get_time_for_greeting") as mock_greeting, \
          patch("src.views.get_summary_card_data") as mock_summary, \
          patch("src.views.top_5_transactions_by_sum") as mock_top, \
+         patch("src.views.detect_anomalies") as mock_anomalies, \
          patch("src.views.actual_currencies") as mock_currencies, \
          patch("src.views.actual_stocks") as mock_stocks:
 
         mock_date_range.return_value = (datetime(2025, 5, 1), datetime(2025, 5, 15))
-        mock_slice_data.return_value = []
+        mock_slice_data.return_value = pd.DataFrame()
         mock_greeting.return_value = "Добрый день!"
         mock_summary.return_value = [{"last_digits": "1234", "total_spent": 1000, "cashback": 10}]
         mock_top.return_value = [{"category": "Продукты", "amount": -500}]
+        mock_anomalies.return_value = [{"category": "Продукты", "amount": 50000, "reasons": ["robust_zscore"]}]
         mock_currencies.return_value = [{"currency": "USD", "rate": 75.5}]
         mock_stocks.return_value = [{"stock": "AAPL", "price": 150.0}]
 
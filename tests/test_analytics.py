@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics import daily_spending_matrix, resample_spending, rolling_spending, spending_series
+
+
+@pytest.fixture
+def series_df():
+    return pd.DataFrame({
+        "Дата операции": ["01.01.2024 10:00:00", "01.01.2024 18:00:00", "03.01.2024 12:00:00",
+                          "10.01.2024 09:00:00", "05.02.2024 15:00:00", "06.02.2024 15:00:00"],
+        "Номер карты": ["*1111", "*1111", "*2222", None, "*1111", "*1111"],
+        "Сумма платежа": [-100.0, -50.0, -200.0, -300.0, -400.0, 1000.0],
+        "Категория": ["Продукты", "Продукты", "Кафе", "Продукты", "Продукты", "Пополнения"],
+        "Сумма операции с округлением": [100.0, 50.0, 200.0, 300.0, 400.0, 1000.0],
+    })
+
+
+def test_daily_spending_matrix(series_df):
+    matrix = daily_spending_matrix(series_df)
+    assert len(matrix) == 36
+    assert ("Продукты", "Карта не указана") in matrix.columns
+    assert ("Пополнения", "*1111") not in matrix.columns
+    assert matrix.loc["2024-01-01", ("Продукты", "*1111")] == 150.0
+    assert matrix.to_numpy().sum() == 1050.0
+
+
+def test_daily_spending_matrix_empty():
+    assert daily_spending_matrix(pd.DataFrame()).empty
+
+
+def test_rolling_spending_matches_pandas(series_df):
+    matrix = daily_spending_matrix(series_df)
+    rolling = rolling_spending(matrix, windows=(7, 30))
+    expected_sum = matrix.rolling(7, min_periods=1).sum()
+    expected_mean = matrix.rolling(30, min_periods=1).mean()
+    assert np.allclose(rolling["sum_7d"].to_numpy(), expected_sum.to_numpy())
+    assert np.allclose(rolling["mean_30d"].to_numpy(), expected_mean.to_numpy())
+
+
+def test_rolling_spending_missing_amount(series_df):
+    series_df.loc[0, "Сумма операции с округлением"] = np.nan
+    matrix = daily_spending_matrix(series_df)
+    assert matrix.loc["2024-01-01", ("Продукты", "*1111")] == 50.0
+    rolling = rolling_spending(matrix, windows=(7,))
+    assert not rolling["sum_7d"].isna().any().any()
+    assert rolling["sum_7d"].loc["2024-02-05", ("Продукты", "*1111")] == 400.0
+
+
+def test_resample_spending_monthly(series_df):
+    monthly = resample_spending(daily_spending_matrix(series_df), "M")
+    assert list(monthly.index.strftime("%Y-%m")) == ["2024-01", "2024-02"]
+    assert monthly.loc["2024-02-01", ("Продукты", "*1111")] == 400.0
+
+
+def test_resample_spending_invalid_freq(series_df):
+    with pytest.raises(ValueError):
+        resample_spending(daily_spending_matrix(series_df), "Y")
+
+
+def test_spending_series_by_category(series_df):
+    data = json.loads(spending_series(series_df, category="Продукты", freq="M"))
+    assert data["series"] == [{"date": "2024-01-01", "total": 450.0}, {"date": "2024-02-01", "total": 400.0}]
+
+
+def test_spending_series_daily_window(series_df):
+    data = json.loads(spending_series(series_df, card="*1111", start_date="01.01.2024", end_date="02.01.2024"))
+    assert data["series"][1]["sum_7d"] == 150.0
+    assert data["series"][1]["mean_7d"] == 75.0
+
+
+def test_spending_series_no_data(series_df):
+    assert json.loads(spending_series(series_df, category="Авиабилеты")) == {"series": []}
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src.anomalies import detect_anomalies
+
+
+@pytest.fixture
+def anomalies_df():
+    dates = [f"{day:02d}.01.2024 12:00:00" for day in range(1, 11)]
+    amounts = [100.0, 110.0, 90.0, 105.0, 95.0, 100.0, 102.0, 98.0, 101.0, 5000.0]
+    return pd.DataFrame({
+        "Дата операции": dates,
+        "Номер карты": ["*1111"] * 10,
+        "Статус": ["OK"] * 10,
+        "Сумма платежа": [-amount for amount in amounts],
+        "Категория": ["Супермаркеты"] * 10,
+        "Описание": ["Магнит"] * 9 + ["Ювелирный"],
+        "Сумма операции с округлением": amounts,
+    })
+
+
+def test_detect_anomalies_outlier(anomalies_df):
+    result = detect_anomalies(anomalies_df)
+    assert len(result) == 1
+    assert result[0]["date"] == "10.01.2024"
+    assert result[0]["amount"] == 5000.0
+    assert result[0]["description"] == "Ювелирный"
+    assert result[0]["reasons"] == ["robust_zscore", "rolling_median"]
+
+
+def test_detect_anomalies_rolling_median_needs_history(anomalies_df):
+    # Крупная покупка в начале истории не с чем сравнить
+    anomalies_df.loc[1, "Сумма операции с округлением"] = 5000.0
+    result = detect_anomalies(anomalies_df, z_threshold=float("inf"))
+    assert [item["date"] for item in result] == ["10.01.2024"]
+
+
+def test_detect_anomalies_since_uses_history(anomalies_df):
+    # Крупная покупка в начале месяца сравнивается с операциями прошлых месяцев
+    anomalies_df.loc[9, "Дата операции"] = "01.02.2024 09:00:00"
+    february = anomalies_df[anomalies_df["Дата операции"].str.contains(".02.2024")]
+    assert detect_anomalies(february) == []
+
+    anomalies_df.loc[1, "Сумма операции с округлением"] = 3000.0
+    result = detect_anomalies(anomalies_df, since=datetime(2024, 2, 1))
+    assert [item["date"] for item in result] == ["01.02.2024"]
+    assert "robust_zscore" in result[0]["reasons"]
+
+
+def test_detect_anomalies_skips_failed_and_income(anomalies_df):
+    anomalies_df.loc[9, "Статус"] = "FAILED"
+    assert detect_anomalies(anomalies_df) == []
+    anomalies_df.loc[9, ["Статус", "Сумма платежа"]] = ["OK", 5000.0]
+    assert detect_anomalies(anomalies_df) == []
+
+
+def test_detect_anomalies_burst():
+    df = pd.DataFrame({
+        "Дата операции": [f"05.02.2024 10:0{minute}:00" for minute in range(5)] + ["05.02.2024 18:00:00"],
+        "Номер карты": ["*2222"] * 6,
+        "Статус": ["OK"] * 6,
+        "Сумма платежа": [-50.0] * 6,
+        "Категория": ["Фастфуд"] * 6,
+        "Описание": ["Вкусно и точка"] * 6,
+        "Сумма операции с округлением": [50.0] * 6,
+    })
+    result = detect_anomalies(df)
+    assert len(result) == 5
+    assert all(item["reasons"] == ["burst"] for item in result)
+    assert detect_anomalies(df, burst_count=6) == []
+
+
+def test_detect_anomalies_limit_newest_first(anomalies_df):
+    anomalies_df.loc[5, "Сумма операции с округлением"] = 4000.0
+    result = detect_anomalies(anomalies_df, limit=1)
+    assert len(result) == 1
+    assert result[0]["date"] == "10.01.2024"
+    assert len(detect_anomalies(anomalies_df)) == 2
+
+
+def test_detect_anomalies_empty():
+    assert detect_anomalies(pd.DataFrame()) == []
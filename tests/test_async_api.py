@@ -0,0 +1,116 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+
+from src.async_api import (
+    StageExecutor,
+    actual_currencies_async,
+    fetch_json,
+    get_high_cashback_categories_async,
+    main_info_async,
+)
+
+
+@pytest.fixture
+def mock_async_dependencies():
+    async def fake_fetch_json(url, params, headers, session=None):
+        if "exchangerates" in url:
+            return {"rates": {"USD": 0.0125}}
+        return {"data": [{"symbol": "AAPL", "adj_close": 150.0}]}
+
+    slice_df = pd.DataFrame({"Дата операции": [pd.Timestamp("2025-05-01 10:00:00")]})
+    with patch("src.async_api.get_slice_of_data", return_value=slice_df), \
+         patch("src.async_api.get_summary_card_data", return_value=[{"last_digits": "1234"}]), \
+         patch("src.async_api.top_5_transactions_by_sum", return_value=[{"amount": 500}]), \
+         patch("src.async_api.detect_anomalies", return_value=[]), \
+         patch("src.async_api.read_user_settings", return_value=["USD"]), \
+         patch("src.async_api.fetch_json", side_effect=fake_fetch_json):
+        yield
+
+
+def test_main_info_async(mock_async_dependencies):
+    executor = StageExecutor(max_workers=2)
+    result = json.loads(asyncio.run(main_info_async("2025-05-01 12:00:00", executor=executor)))
+    executor.shutdown()
+    assert list(result) == [
+        "greeting", "cards", "top_transactions", "anomalies", "currency_rates", "stock_prices"
+    ]
+    assert result["currency_rates"] == [{"currency": "USD", "rate": 80.0}]
+    assert result["stock_prices"] == [{"stock": "AAPL", "price": 150.0}]
+    assert result["cards"] == [{"last_digits": "1234"}]
+
+
+def test_main_info_async_invalid_date():
+    with pytest.raises(ValueError):
+        asyncio.run(main_info_async("01.05.2025"))
+
+
+def test_main_info_async_cancellation(mock_async_dependencies):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_slice(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return pd.DataFrame()
+
+    async def scenario(executor):
+        task = asyncio.create_task(main_info_async("2025-05-01 12:00:00", executor=executor))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    executor = StageExecutor(max_workers=1)
+    with patch("src.async_api.get_slice_of_data", side_effect=slow_slice), \
+         patch("src.async_api.get_summary_card_data") as mock_summary:
+        asyncio.run(scenario(executor))
+        release.set()
+        executor.shutdown()
+        # Этапы после отменённого чтения не запускаются
+        mock_summary.assert_not_called()
+
+
+def test_stage_executor_bounds_concurrency():
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def stage():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    async def scenario(executor):
+        await asyncio.gather(*(executor.run(stage) for _ in range(6)))
+
+    executor = StageExecutor(max_workers=2)
+    asyncio.run(scenario(executor))
+    executor.shutdown()
+    assert peak[0] == 2
+
+
+def test_fetch_json_requests_fallback():
+    with patch("src.async_api.HAS_AIOHTTP", False), patch("src.async_api.requests.get") as mock_get:
+        mock_get.return_value = Mock(status_code=200, json=Mock(return_value={"ok": True}))
+        assert asyncio.run(fetch_json("http://example", {"a": 1}, {})) == {"ok": True}
+        mock_get.return_value = Mock(status_code=500, reason="Server Error")
+        assert asyncio.run(fetch_json("http://example", {"a": 1}, {})) is None
+
+
+def test_actual_currencies_async_settings_not_found():
+    with patch("src.async_api.read_user_settings", return_value=None):
+        assert asyncio.run(actual_currencies_async()) == []
+
+
+def test_get_high_cashback_categories_async_does_not_mutate(sample_dataframe):
+    original = sample_dataframe.copy()
+    result = json.loads(asyncio.run(get_high_cashback_categories_async(sample_dataframe, "2025", "02")))
+    assert "Супермаркеты" in result["cashback_analysis"]
+    pd.testing.assert_frame_equal(sample_dataframe, original)
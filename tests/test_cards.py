@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from src.cards import (
+    build_card_dimension,
+    card_summary_records,
+    card_totals,
+    dimension_from_numbers,
+    encode_cards,
+    merge_card_summaries,
+    partial_card_summary,
+)
+
+
+def test_build_card_dimension(sample_data_with_cards):
+    dimension = build_card_dimension(sample_data_with_cards["Номер карты"])
+    assert dimension["Номер карты"].tolist() == ["*2222", "*3333", "*5678", "*5998"]
+    assert dimension["last_digits"].tolist() == ["2222", "3333", "5678", "5998"]
+
+
+def test_build_card_dimension_keeps_existing_codes(sample_data_with_cards):
+    dimension = build_card_dimension(sample_data_with_cards["Номер карты"])
+    extended = build_card_dimension(pd.Series(["*1111", "*5678", None]), dimension)
+    assert extended["Номер карты"].tolist() == ["*2222", "*3333", "*5678", "*5998", "*1111"]
+
+
+def test_encode_cards(sample_data_with_cards):
+    dimension = build_card_dimension(sample_data_with_cards["Номер карты"])
+    assert encode_cards(pd.Series(["*5678", "*0000", None]), dimension).tolist() == [2, -1, -1]
+
+
+def test_partial_card_summary(sample_data_with_cards):
+    dimension = build_card_dimension(sample_data_with_cards["Номер карты"])
+    summary = partial_card_summary(sample_data_with_cards, dimension)
+    assert summary.tolist() == [[2000.0, 1500.0, 1500.0, 0.0], [1.0, 1.0, 2.0, 0.0]]
+
+
+def test_merge_card_summaries_matches_full_table(sample_data_with_cards):
+    dimension = build_card_dimension(sample_data_with_cards["Номер карты"])
+    parts = [sample_data_with_cards.iloc[:2], sample_data_with_cards.iloc[2:]]
+    # Первая частичная сводка посчитана, пока в справочнике было меньше карт
+    first = partial_card_summary(parts[0], dimension.iloc[:3])
+    merged = merge_card_summaries([first, partial_card_summary(parts[1], dimension)], len(dimension))
+    assert np.array_equal(merged, partial_card_summary(sample_data_with_cards, dimension))
+
+
+def test_card_summary_records(sample_data_with_cards):
+    dimension = build_card_dimension(pd.Series(["*5678", "*2222", "*3333", "*5998"]))
+    dimension = build_card_dimension(pd.Series(["*0001"]), dimension)
+    summary = partial_card_summary(sample_data_with_cards, dimension)
+    assert card_summary_records(summary, dimension) == [
+        {"last_digits": "2222", "total_spent": 2000.0, "cashback": 20.0},
+        {"last_digits": "3333", "total_spent": 1500.0, "cashback": 15.0},
+        {"last_digits": "5678", "total_spent": 1500.0, "cashback": 15.0},
+    ]
+
+
+def test_card_totals_skips_missing_amounts():
+    summary = card_totals(np.array([0, 0, 1, -1]), np.array([100.0, np.nan, np.nan, 50.0]), 2)
+    assert summary.tolist() == [[100.0, 0.0], [2.0, 1.0]]
+
+
+def test_dimension_from_numbers_keeps_order():
+    dimension = dimension_from_numbers(pd.Index(["*5555", "*1111"]))
+    assert encode_cards(pd.Series(["*1111", "*5555"]), dimension).tolist() == [1, 0]
+    assert dimension["last_digits"].tolist() == ["5555", "1111"]
@@ -0,0 +1,115 @@
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+
+from src.currency import (
+    convert_operations,
+    convert_to_base,
+    fetch_rates,
+    get_rates,
+    implied_rates,
+    load_rates,
+    save_rates,
+)
+
+
+@pytest.fixture
+def rates():
+    return pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-01", "2024-01-10", "2024-01-01"]),
+        "currency": ["USD", "USD", "EUR"],
+        "rate": [90.0, 100.0, 95.0],
+    })
+
+
+@pytest.fixture
+def currency_df():
+    return pd.DataFrame({
+        "Дата операции": ["05.01.2024 12:00:00", "12.01.2024 12:00:00", "12.01.2024 13:00:00",
+                          "20.12.2023 10:00:00", "не дата"],
+        "Сумма операции": [-10.0, -10.0, -500.0, -2.0, -1.0],
+        "Валюта операции": ["USD", "USD", "RUB", "EUR", "USD"],
+        "Сумма платежа": [-10.0, -10.0, -500.0, -2.0, -1.0],
+        "Валюта платежа": ["USD", "USD", "RUB", "EUR", "USD"],
+        "Сумма операции с округлением": [10.0, 10.0, 500.0, 2.0, 1.0],
+    })
+
+
+def test_convert_to_base_as_of(currency_df, rates):
+    result = convert_to_base(currency_df, rates)
+    # Курс на дату операции; до первого курса берётся ближайший следующий; без даты — не пересчитывается
+    assert result["Сумма платежа"].tolist() == [-900.0, -1000.0, -500.0, -190.0, -1.0]
+    assert result["Сумма операции с округлением"].tolist() == [900.0, 1000.0, 500.0, 190.0, 1.0]
+    assert result["Валюта платежа"].tolist() == ["RUB", "RUB", "RUB", "RUB", "USD"]
+    assert result["Исходная сумма платежа"].tolist() == [-10.0, -10.0, -500.0, -2.0, -1.0]
+    assert result["Исходная валюта платежа"].tolist() == ["USD", "USD", "RUB", "EUR", "USD"]
+    assert currency_df["Валюта платежа"].tolist()[0] == "USD"
+
+
+def test_convert_to_base_unknown_currency(currency_df, rates):
+    result = convert_to_base(currency_df, rates[rates["currency"] == "USD"])
+    assert result["Сумма платежа"].tolist()[3] == -2.0
+    assert result["Валюта платежа"].tolist()[3] == "EUR"
+
+
+def test_implied_rates():
+    df = pd.DataFrame({
+        "Дата операции": ["21.09.2019 07:34:12", "21.09.2019 08:42:19", "30.09.2019 21:46:46"],
+        "Сумма операции": [-500.0, -3000.0, -42.0],
+        "Валюта операции": ["CNY", "RUB", "RUB"],
+        "Сумма платежа": [-4600.0, -300.0, -4.2],
+        "Валюта платежа": ["RUB", "CNY", "CNY"],
+        "Сумма операции с округлением": [4600.0, 300.0, 4.2],
+    })
+    result = implied_rates(df)
+    assert result["currency"].tolist() == ["CNY", "CNY"]
+    assert result["date"].tolist() == [pd.Timestamp("2019-09-21"), pd.Timestamp("2019-09-30")]
+    assert result["rate"].round(2).tolist() == [9.6, 10.0]
+
+
+def test_rates_round_trip(tmp_path, rates):
+    path = str(tmp_path / "rates.csv")
+    assert load_rates(path).empty
+    save_rates(rates, path)
+    result = load_rates(path)
+    assert result["currency"].tolist() == ["EUR", "USD", "USD"]
+    assert result["date"].tolist()[0] == pd.Timestamp("2024-01-01")
+
+
+def test_fetch_rates_without_api_key():
+    with patch.dict("os.environ", {"API_KEY_APILAYER": ""}), patch("src.currency.requests.get") as mock_get:
+        assert fetch_rates(["USD"], datetime(2024, 1, 1), datetime(2024, 1, 2)).empty
+        mock_get.assert_not_called()
+
+
+def test_get_rates_fetches_and_caches(tmp_path, rates):
+    path = str(tmp_path / "rates.csv")
+    save_rates(rates[rates["currency"] == "EUR"], path)
+    response = Mock(status_code=200)
+    response.json.return_value = {"rates": {"2024-01-01": {"USD": 0.01}, "2024-01-02": {"USD": 0.0125}}}
+    with patch.dict("os.environ", {"API_KEY_APILAYER": "key"}), \
+         patch("src.currency.requests.get", return_value=response) as mock_get:
+        result = get_rates(["USD"], datetime(2024, 1, 1), datetime(2024, 1, 2), path)
+        assert mock_get.call_args.kwargs["params"]["symbols"] == "USD"
+        assert result[result["currency"] == "USD"]["rate"].tolist() == [100.0, 80.0]
+        # Повторный запрос берёт курсы из сохранённой таблицы
+        get_rates(["USD", "EUR"], datetime(2024, 1, 1), datetime(2024, 1, 2), path)
+        assert mock_get.call_count == 1
+    assert set(load_rates(path)["currency"]) == {"EUR", "USD"}
+
+
+def test_convert_operations_falls_back_to_implied_rates(tmp_path):
+    df = pd.DataFrame({
+        "Дата операции": ["21.09.2019 07:34:12", "24.09.2019 19:15:33"],
+        "Сумма операции": [-500.0, -32.0],
+        "Валюта операции": ["CNY", "CNY"],
+        "Сумма платежа": [-4600.0, -32.0],
+        "Валюта платежа": ["RUB", "CNY"],
+        "Сумма операции с округлением": [4600.0, 32.0],
+    })
+    with patch("src.currency.fetch_rates", return_value=load_rates(str(tmp_path / "none.csv"))):
+        result = convert_operations(df, path=str(tmp_path / "rates.csv"))
+    assert result["Сумма платежа"].tolist() == [-4600.0, -294.4]
+    assert result["Валюта платежа"].tolist() == ["RUB", "RUB"]
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src.ingest import SHEET_NAME, available_engines, read_operations, resolve_engine
+
+
+@pytest.fixture
+def operations_df():
+    return pd.DataFrame({
+        "Дата операции": ["31.12.2021 16:44:00", "30.12.2021 12:00:00", "29.12.2021 10:15:00"],
+        "Номер карты": ["*7197", None, "*4556"],
+        "Сумма платежа": [-160.89, -64.0, 5000.0],
+        "Категория": ["Супермаркеты", "Фастфуд", "Пополнения"],
+        "Описание": ["Колхоз", "Вкусно и точка", "Пополнение"],
+        "Бонусы (включая кэшбэк)": [3, 1, 0],
+    })
+
+
+@pytest.fixture
+def operations_xlsx(tmp_path, operations_df):
+    path = str(tmp_path / "operations.xlsx")
+    operations_df.to_excel(path, sheet_name=SHEET_NAME, index=False)
+    return path
+
+
+def test_xml_engine_matches_openpyxl(operations_xlsx):
+    expected = read_operations(operations_xlsx, engine="openpyxl")
+    result = read_operations(operations_xlsx, engine="xml")
+    pd.testing.assert_frame_equal(result, expected)
+    assert result["Бонусы (включая кэшбэк)"].dtype == "int64"
+    assert pd.isna(result.loc[1, "Номер карты"])
+
+
+def test_xml_engine_column_projection(operations_xlsx):
+    result = read_operations(operations_xlsx, engine="xml", columns=["Категория", "Сумма платежа"])
+    assert list(result.columns) == ["Сумма платежа", "Категория"]
+    assert result["Сумма платежа"].tolist() == [-160.89, -64.0, 5000.0]
+
+
+def test_xml_engine_missing_column(operations_xlsx):
+    with pytest.raises(ValueError):
+        read_operations(operations_xlsx, engine="xml", columns=["Кэшбэк"])
+
+
+def test_csv_engine(tmp_path, operations_df):
+    path = str(tmp_path / "operations.csv")
+    operations_df.to_csv(path, index=False)
+    result = read_operations(path, columns=["Категория"])
+    assert result["Категория"].tolist() == ["Супермаркеты", "Фастфуд", "Пополнения"]
+
+
+def test_resolve_engine_by_extension():
+    assert resolve_engine("operations.csv") == "csv"
+    assert resolve_engine("operations.xlsx") in ("calamine", "xml")
+
+
+def test_resolve_engine_prefers_xml_without_calamine():
+    with patch("src.ingest.is_engine_available", side_effect=lambda name: name != "calamine"):
+        assert resolve_engine("operations.xlsx") == "xml"
+    with patch("src.ingest.is_engine_available", side_effect=lambda name: name == "openpyxl"):
+        assert resolve_engine("operations.xlsx") == "openpyxl"
+
+
+def test_resolve_engine_errors():
+    with pytest.raises(ValueError):
+        resolve_engine("operations.txt")
+    with pytest.raises(ValueError):
+        resolve_engine("operations.xlsx", engine="unknown")
+
+
+def test_available_engines():
+    engines = available_engines()
+    assert "xml" in engines
+    assert "csv" in engines
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pandas as pd
+
+from src.profiling import StageProfiler, _safe_name, record_rows
+
+
+def _stage(df: pd.DataFrame) -> int:
+    return int(df.groupby("Категория")["Сумма платежа"].sum().count())
+
+
+def _loader(count: int) -> pd.DataFrame:
+    record_rows(count)
+    return pd.DataFrame({"a": range(3)})
+
+
+def test_disabled_profiler_only_runs_stage(tmp_path):
+    output_dir = tmp_path / "profiles"
+    profiler = StageProfiler(str(output_dir), enabled=False)
+    df = pd.DataFrame({"Категория": ["Кафе", "Топливо"], "Сумма платежа": [-1.0, -2.0]})
+
+    assert profiler.run("stage", _stage, df) == 2
+    assert profiler.write_summary() is None
+    assert profiler.stages == []
+    assert not output_dir.exists()
+
+
+def test_enabled_profiler_writes_reports(tmp_path):
+    profiler = StageProfiler(str(tmp_path), top=5)
+    df = pd.DataFrame({"Категория": ["Кафе", "Топливо", "Кафе"], "Сумма платежа": [-1.0, -2.0, -3.0]})
+
+    assert profiler.run("group stage", _stage, df) == 2
+    summary_path = profiler.write_summary()
+
+    assert os.path.exists(tmp_path / "01_group_stage.prof")
+    report = (tmp_path / "01_group_stage.txt").read_text(encoding="utf-8")
+    assert "Этап: group stage" in report
+    assert "Строк обработано: 3" in report
+
+    with open(summary_path, encoding="utf-8") as file:
+        (stage,) = json.load(file)["stages"]
+    assert stage["stage"] == "group stage"
+    assert stage["rows"] == 3
+    assert stage["wall_time_s"] >= 0
+    assert stage["peak_memory_mb"] >= 0
+    assert "groupby" in stage["watched_functions_s"]
+    assert 0 < len(stage["top_functions"]) <= 5
+    assert len(stage["top_allocations"]) <= 5
+
+
+def test_recorded_rows_take_precedence(tmp_path):
+    profiler = StageProfiler(str(tmp_path))
+
+    profiler.run("load", _loader, 100)
+    profiler.run("plain", sum, [1, 2])
+    record_rows(50)
+
+    assert [stage["rows"] for stage in profiler.stages] == [100, None]
+    assert os.path.exists(tmp_path / "02_plain.txt")
+
+
+def test_safe_name():
+    assert _safe_name("main info/2024") == "main_info_2024"
+    assert _safe_name("read_data_file") == "read_data_file"
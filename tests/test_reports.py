@@ -1,7 +1,7 @@
 import pandas as pd
 import json
 from datetime import datetime
-from src.reports import spending_by_category
+from src.reports import spending_by_category, spending_by_category_date_range
 
 def test_spending_by_category_valid():
     data = {
@@ -51,4 +51,11 @@ def test_spending_by_category_invalid_date_format():
     df = pd.DataFrame(columns=["Дата операции", "Сумма платежа", "Категория"])
     result = spending_by_category(df, category="Продукты", start_date="не дата")
 
-    assert "error" in result
\ No newline at end of file
+    assert "error" in result
+
+
+def test_spending_by_category_date_range():
+    assert spending_by_category_date_range("30.04.2024") == (datetime(2024, 1, 31), datetime(2024, 4, 30))
+    assert spending_by_category_date_range(datetime(2024, 4, 30, 12)) == (
+        datetime(2024, 1, 31, 12), datetime(2024, 4, 30, 12)
+    )
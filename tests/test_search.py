@@ -0,0 +1,78 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.cards import NO_CARD
+from src.search import build_search_index, search_transactions
+
+
+@pytest.fixture
+def search_df():
+    return pd.DataFrame({
+        "Дата операции": ["01.12.2021 10:00:00", "05.12.2021 12:00:00", "10.12.2021 18:00:00",
+                          "15.11.2021 09:00:00", "20.12.2021 20:00:00"],
+        "Номер карты": ["*7197", "*7197", "*4556", "*7197", None],
+        "Категория": ["Супермаркеты", "Супермаркеты", "Фастфуд", "Супермаркеты", "Переводы"],
+        "Описание": ["Магнит", "Пятёрочка", "Магнит Косметик", "Магнит", "Перевод Ивану И."],
+        "Сумма операции с округлением": [100.0, 200.0, 300.0, 400.0, 500.0],
+    })
+
+
+def test_search_substring(search_df):
+    index = build_search_index(search_df)
+    rows = index.search("агни")
+    # От новых к старым
+    assert rows.tolist() == [2, 0, 3]
+
+
+def test_search_several_words_and_case(search_df):
+    index = build_search_index(search_df)
+    assert index.search("МАГНИТ косм").tolist() == [2]
+
+
+def test_search_short_prefix(search_df):
+    index = build_search_index(search_df)
+    assert index.search("пя").tolist() == [1]
+    assert index.search("ят").tolist() == []
+
+
+def test_search_with_filters(search_df):
+    index = build_search_index(search_df)
+    rows = index.search("магнит", start_date=pd.Timestamp("2021-12-01"), category="Супермаркеты")
+    assert rows.tolist() == [0]
+
+
+def test_search_after_append(search_df):
+    index = build_search_index(search_df.iloc[:3])
+    index.append(search_df.iloc[3:])
+    assert len(index) == 5
+    assert index.search("магнит").tolist() == [2, 0, 3]
+    assert index.search("перевод").tolist() == [4]
+
+
+def test_search_transactions_json(search_df):
+    index = build_search_index(search_df)
+    data = json.loads(search_transactions(index, "магнит", start_date="01.12.2021", end_date="10.12.2021", limit=1))
+    assert data["total"] == 2
+    assert data["transactions"] == [
+        {"date": "10.12.2021", "amount": 300.0, "category": "Фастфуд", "card": "*4556",
+         "description": "Магнит Косметик"}
+    ]
+
+
+def test_search_transactions_missing_card_and_category(search_df):
+    search_df.loc[4, "Категория"] = None
+    index = build_search_index(search_df)
+
+    def reject_constant(name):
+        raise ValueError(f"Недопустимое значение в JSON: {name}")
+
+    data = json.loads(search_transactions(index, "перевод"), parse_constant=reject_constant)
+    assert data["transactions"][0]["card"] == NO_CARD
+    assert data["transactions"][0]["category"] is None
+
+
+def test_search_transactions_invalid_date(search_df):
+    index = build_search_index(search_df)
+    assert "error" in json.loads(search_transactions(index, "магнит", start_date="не дата"))
@@ -1,7 +1,12 @@
-import pytest
-import pandas as pd
 import json
-from src.services import get_high_cashback_categories
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import get_high_cashback_categories, high_cashback_date_range, optimize_cashback_categories
 
 
 @pytest.fixture
@@ -65,4 +70,80 @@ def test_spent_only_excludes_cash_and_transfers():
     })
     result = get_high_cashback_categories(df, "2024", "01")
     data = json.loads(result)
-    assert list(data["cashback_analysis"].keys()) == ["Продукты"]
\ No newline at end of file
+    assert list(data["cashback_analysis"].keys()) == ["Продукты"]
+
+
+@pytest.fixture
+def history_df():
+    return pd.DataFrame({
+        "Дата операции": ["05.01.2024", "10.01.2024", "12.01.2024", "05.02.2024", "07.02.2024", "09.02.2024"],
+        "Номер карты": ["*1111", "*1111", "*2222", "*1111", "*2222", "*1111"],
+        "Сумма платежа": [-10000, -2000, -5000, -20000, -500, -1000],
+        "Категория": ["Продукты", "Кафе", "Кафе", "Продукты", "Аптеки", "Переводы"],
+        "Сумма операции с округлением": [10000, 2000, 5000, 20000, 500, 1000]
+    })
+
+
+@pytest.fixture
+def rates_df():
+    return pd.DataFrame({
+        "Категория": ["Продукты", "Кафе", "Аптеки", "Переводы"],
+        "cashback_rate": [0.05, 0.1, 0.05, 0.05],
+        "cap": [500, None, None, None]
+    })
+
+
+def test_optimize_cashback_categories(history_df, rates_df):
+    data = json.loads(optimize_cashback_categories(history_df, rates_df, n_categories=2))
+    assert data["period"] == "2024-01 — 2024-02"
+    assert [item["category"] for item in data["selection"]] == ["Продукты", "Кафе"]
+    # Продукты: min(5% от 10000/20000, лимит 500) = 500 в месяц против стандартных 150 в среднем
+    assert data["selection"][0]["expected_cashback"] == 500.0
+    assert data["selection"][0]["gain"] == 350.0
+    assert data["projected_gain"] == 665.0
+
+
+def test_optimize_cashback_categories_by_user(history_df, rates_df):
+    data = json.loads(optimize_cashback_categories(history_df, rates_df, n_categories=1, by="Номер карты"))
+    assert data["users"]["*1111"]["selection"][0]["category"] == "Продукты"
+    assert data["users"]["*2222"]["selection"][0]["category"] == "Кафе"
+
+
+def test_optimize_cashback_categories_recent_months(history_df, rates_df):
+    data = json.loads(optimize_cashback_categories(history_df, rates_df, n_categories=3, months=1))
+    assert data["period"] == "2024-02 — 2024-02"
+    assert [item["category"] for item in data["selection"]] == ["Продукты", "Аптеки"]
+
+
+def test_optimize_cashback_categories_invalid_rates(history_df):
+    rates = pd.DataFrame({"Категория": ["Кафе"], "cashback_rate": [0.05]})
+    assert "error" in json.loads(optimize_cashback_categories(history_df, rates))
+
+
+def test_optimize_cashback_categories_empty(rates_df):
+    assert "error" in json.loads(optimize_cashback_categories(pd.DataFrame(), rates_df))
+
+
+def test_high_cashback_date_range():
+    assert high_cashback_date_range("2024", "02") == (datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59, 59))
+
+
+def test_optimize_cashback_categories_missing_amount(history_df, rates_df):
+    history_df.loc[0, "Сумма операции с округлением"] = np.nan
+    result = optimize_cashback_categories(history_df, rates_df, n_categories=2, by="Номер карты")
+    assert "NaN" not in result
+    for user in json.loads(result)["users"].values():
+        assert all(item["gain"] > 0 for item in user["selection"])
+
+
+def test_optimize_cashback_categories_invalid_months(history_df, rates_df):
+    data = json.loads(optimize_cashback_categories(history_df, rates_df, months=0))
+    assert data == {"error": "Количество месяцев должно быть положительным"}
+
+
+def test_optimize_cashback_categories_no_caps(history_df, rates_df):
+    rates_df["cap"] = pd.Series([None] * len(rates_df), dtype=object)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        data = json.loads(optimize_cashback_categories(history_df, rates_df, n_categories=1))
+    assert data["selection"][0]["cap"] is None
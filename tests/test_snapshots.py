@@ -0,0 +1,103 @@
+import gzip
+import json
+import sqlite3
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src.reports import spending_by_category
+from src.services import get_high_cashback_categories
+from src.snapshots import (
+    build_snapshots,
+    cashback_snapshot,
+    export_snapshots,
+    month_end,
+    read_snapshot,
+    spending_key,
+    spending_snapshot,
+)
+
+
+@pytest.fixture
+def snapshot_df():
+    return pd.DataFrame({
+        "Дата операции": ["01.03.2024 12:00:00", "15.01.2024 10:00:00", "10.02.2024 09:00:00",
+                          "31.01.2024 23:00:00", "05.05.2024 08:00:00"],
+        "Сумма платежа": [-300.0, -100.0, -250.0, -200.0, -50.0],
+        "Категория": ["Кафе", "Продукты", "Продукты", "Кафе", "Продукты"],
+        "Описание": ["Шоколадница", "Магнит", "Пятёрочка", "Шоколадница", "Магнит"],
+        "Сумма операции с округлением": [300.0, 100.0, 250.0, 200.0, 50.0],
+    })
+
+
+def test_build_snapshots_matches_reports(tmp_path, snapshot_df):
+    db_path = str(tmp_path / "snapshots.sqlite")
+    result = build_snapshots(snapshot_df, db_path)
+    assert result["cashback_months"] == ["2024-01", "2024-02", "2024-03", "2024-05"]
+
+    assert cashback_snapshot("2024", "01", db_path) == get_high_cashback_categories(snapshot_df.copy(), "2024", "01")
+    for category in ["Кафе", "Продукты"]:
+        expected = spending_by_category(snapshot_df.copy(), category, month_end("2024-03"))
+        assert spending_snapshot(category, "2024", "03", db_path) == expected
+    # Окно отчёта на конец мая начинается 2 марта — кафе в нём нет
+    assert json.loads(spending_snapshot("Кафе", "2024", "05", db_path)) == {"Кафе": []}
+    assert spending_snapshot("Кафе", "2023", "12", db_path) is None
+
+
+def test_build_snapshots_incremental(tmp_path, snapshot_df):
+    db_path = str(tmp_path / "snapshots.sqlite")
+    build_snapshots(snapshot_df, db_path)
+    assert build_snapshots(snapshot_df, db_path)["snapshots"] == 0
+
+    snapshot_df.loc[2, "Сумма платежа"] = -260.0
+    result = build_snapshots(snapshot_df, db_path)
+    assert result["cashback_months"] == ["2024-02"]
+    # Февраль попадает в окна отчётов на конец февраля и марта
+    assert result["spending_months"] == ["2024-02", "2024-03"]
+    assert "-260.0" in spending_snapshot("Продукты", "2024", "03", db_path)
+    # Март пересчитан только из-за окна отчёта о расходах — его снимок кешбэка сохраняется
+    assert cashback_snapshot("2024", "03", db_path) == get_high_cashback_categories(snapshot_df.copy(), "2024", "03")
+
+    result = build_snapshots(snapshot_df.drop(index=4), db_path)
+    assert result["removed_months"] == ["2024-05"]
+    assert cashback_snapshot("2024", "05", db_path) is None
+
+
+def test_build_snapshots_follows_report_window(tmp_path, snapshot_df):
+    db_path = str(tmp_path / "snapshots.sqlite")
+    # Снимки берут окно у самого отчёта: при окне в 120 дней майский отчёт включает февральскую покупку
+    with patch("src.reports.SPENDING_WINDOW_DAYS", 120):
+        build_snapshots(snapshot_df, db_path)
+        expected = spending_by_category(snapshot_df.copy(), "Продукты", month_end("2024-05"))
+    assert "2024-02-10" in expected
+    assert spending_snapshot("Продукты", "2024", "05", db_path) == expected
+
+    snapshot_df.loc[2, "Сумма платежа"] = -260.0
+    with patch("src.reports.SPENDING_WINDOW_DAYS", 120):
+        result = build_snapshots(snapshot_df, db_path)
+    assert "2024-05" in result["spending_months"]
+
+
+def test_read_snapshot_checksum(tmp_path, snapshot_df):
+    db_path = str(tmp_path / "snapshots.sqlite")
+    build_snapshots(snapshot_df, db_path)
+    key = spending_key("2024-01", "Кафе")
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("UPDATE snapshots SET payload = ? WHERE key = ?", (gzip.compress(b"{}"), key))
+    with pytest.raises(ValueError):
+        read_snapshot(key, db_path)
+
+
+def test_build_snapshots_missing_columns(tmp_path, snapshot_df):
+    with pytest.raises(ValueError):
+        build_snapshots(snapshot_df.drop(columns=["Категория"]), str(tmp_path / "snapshots.sqlite"))
+
+
+def test_export_snapshots(tmp_path, snapshot_df):
+    db_path = str(tmp_path / "snapshots.sqlite")
+    build_snapshots(snapshot_df, db_path)
+    paths = export_snapshots(["cashback/2024-01", "cashback/2023-01"], str(tmp_path / "static"), db_path)
+    assert len(paths) == 1
+    with gzip.open(paths[0], "rt", encoding="utf-8") as file:
+        assert file.read() == read_snapshot("cashback/2024-01", db_path)
@@ -0,0 +1,156 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.reports import spending_by_category
+from src.services import get_high_cashback_categories
+from src.sql_backend import (
+    build_database,
+    high_cashback_categories_sql,
+    is_database_fresh,
+    load_database,
+    query,
+    spending_by_category_sql,
+    summary_card_data_sql,
+)
+from src.utils import get_summary_card_data
+
+
+@pytest.fixture
+def operations_df():
+    # Детерминированная выборка: несколько карт, категорий и месяцев, доходы, исключённые категории и пропуски
+    rng = np.random.default_rng(7)
+    n = 400
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 150 * 24 * 60, n), unit="min")
+    amounts = -np.round(rng.uniform(10, 5000, n), 2)
+    amounts[::17] *= -1
+    categories = rng.choice(["Супермаркеты", "Кафе", "Топливо", "Переводы", "Наличные", "Аптеки"], n).astype(object)
+    categories[::23] = None
+    cards = rng.choice(["*1111", "*2222", "*3333"], n).astype(object)
+    cards[::19] = None
+    return pd.DataFrame({
+        "Дата операции": dates.strftime("%d.%m.%Y %H:%M:%S"),
+        "Номер карты": cards,
+        "Статус": "OK",
+        "Сумма платежа": amounts,
+        "Категория": categories,
+        "Описание": [f"Магазин {i % 13}" for i in range(n)],
+        "Сумма операции с округлением": np.abs(amounts),
+    })
+
+
+@pytest.fixture
+def db_path(tmp_path, operations_df):
+    path = str(tmp_path / "operations.sqlite")
+    build_database(operations_df, path)
+    return path
+
+
+def assert_reports_equal(expected, actual):
+    """Сравнивает отчёты с точностью до копейки: SQL складывает суммы в копейках, pandas — в float."""
+    if isinstance(expected, dict):
+        assert list(expected) == list(actual)
+        for key in expected:
+            assert_reports_equal(expected[key], actual[key])
+    elif isinstance(expected, list):
+        assert len(expected) == len(actual)
+        for expected_item, actual_item in zip(expected, actual):
+            assert_reports_equal(expected_item, actual_item)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, abs=0.011)
+    else:
+        assert expected == actual
+
+
+@pytest.mark.parametrize("category", ["Супермаркеты", "Кафе", "Переводы", "Нет такой"])
+@pytest.mark.parametrize("start_date", ["15.03.2024", "31.05.2024", "01.01.2024"])
+def test_spending_by_category_parity(operations_df, db_path, category, start_date):
+    expected = json.loads(spending_by_category(operations_df.copy(), category, start_date))
+    assert_reports_equal(expected, json.loads(spending_by_category_sql(category, start_date, db_path)))
+
+
+@pytest.mark.parametrize(
+    "year, month", [("2024", "01"), ("2024", "03"), ("2024", "05"), ("2023", "12"), ("2024", "ab")]
+)
+def test_high_cashback_categories_parity(operations_df, db_path, year, month):
+    expected = json.loads(get_high_cashback_categories(operations_df.copy(), year, month))
+    assert_reports_equal(expected, json.loads(high_cashback_categories_sql(year, month, db_path)))
+
+
+def test_high_cashback_categories_parity_with_ties(tmp_path):
+    # Равные суммы: порядок категорий определяется названием, а не порядком строк
+    categories = ["Цветы", "Мобильная связь", "Аптеки", "Книги", "Кафе", "Супермаркеты"] * 3
+    amounts = [100.0, 100.0, 50.0, 100.0, 200.0, 50.0] * 3
+    df = pd.DataFrame({
+        "Дата операции": [f"{day + 1:02d}.04.2018 12:00:00" for day in range(len(categories))],
+        "Номер карты": "*1111",
+        "Статус": "OK",
+        "Сумма платежа": [-amount for amount in amounts],
+        "Категория": categories,
+        "Описание": "",
+        "Сумма операции с округлением": amounts,
+    })
+    path = str(tmp_path / "operations.sqlite")
+    build_database(df, path)
+    expected = json.loads(get_high_cashback_categories(df.copy(), "2018", "04"))
+    actual = json.loads(high_cashback_categories_sql("2018", "04", path))
+    assert list(expected["cashback_analysis"]) == [
+        "Кафе", "Книги", "Мобильная связь", "Цветы", "Аптеки", "Супермаркеты"
+    ]
+    assert_reports_equal(expected, actual)
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date",
+    [(None, None), (datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59, 59)), (datetime(2024, 4, 10), None)],
+)
+def test_summary_card_data_parity(operations_df, db_path, start_date, end_date):
+    df = operations_df.assign(
+        **{
+            "Дата операции": pd.to_datetime(operations_df["Дата операции"], dayfirst=True),
+            "Номер карты": operations_df["Номер карты"].fillna("Карта не указана"),
+        }
+    )
+    mask = pd.Series(True, index=df.index)
+    if start_date is not None:
+        mask &= df["Дата операции"] >= start_date
+    if end_date is not None:
+        mask &= df["Дата операции"] <= end_date
+    expected = get_summary_card_data(df[mask])
+    assert_reports_equal(expected, summary_card_data_sql(start_date, end_date, db_path))
+
+
+def test_summary_card_data_null_rounded(tmp_path, operations_df):
+    # Карта, у всех расходов которой нет суммы с округлением, попадает в сводку с нулём, как в pandas
+    operations_df.loc[operations_df["Номер карты"] == "*3333", "Сумма операции с округлением"] = np.nan
+    path = str(tmp_path / "operations.sqlite")
+    build_database(operations_df, path)
+    df = operations_df.assign(**{"Номер карты": operations_df["Номер карты"].fillna("Карта не указана")})
+    expected = get_summary_card_data(df)
+    assert {"last_digits": "3333", "total_spent": 0.0, "cashback": 0.0} in expected
+    assert_reports_equal(expected, summary_card_data_sql(db_path=path))
+
+
+def test_query_uses_indexes(db_path):
+    plan = query(
+        "EXPLAIN QUERY PLAN SELECT * FROM operations WHERE category = ? AND op_date BETWEEN ? AND ?",
+        ("Кафе", "2024-01-01 00:00:00", "2024-02-01 00:00:00"),
+        db_path,
+    )
+    assert "operations_category_date" in " ".join(plan["detail"])
+    assert query("SELECT COUNT(*) AS n FROM operations", db_path=db_path)["n"][0] == 400
+
+
+def test_load_database_rebuilds_stale(tmp_path, operations_df):
+    source = str(tmp_path / "operations.csv")
+    db_path = str(tmp_path / "operations.sqlite")
+    operations_df.to_csv(source, index=False)
+    assert not is_database_fresh(db_path, source)
+    load_database(source, db_path)
+    assert is_database_fresh(db_path, source)
+    os.utime(source, (0, 0))
+    assert not is_database_fresh(db_path, source)
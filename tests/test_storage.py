@@ -0,0 +1,167 @@
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src.storage import (
+    append_to_partition_store,
+    build_partition_store,
+    card_summary_from_store,
+    is_store_fresh,
+    load_operations,
+    load_search_index,
+    read_partition_store,
+    save_manifest,
+)
+
+
+@pytest.fixture
+def store_df():
+    return pd.DataFrame({
+        "Дата операции": ["15.01.2024 10:00:00", "31.01.2024 23:00:00", "01.02.2024 09:00:00",
+                          "10.03.2024 12:00:00", "не дата"],
+        "Номер карты": ["*1111", "*2222", "*1111", "*2222", "*1111"],
+        "Сумма платежа": [-100.0, -200.0, -300.0, -400.0, -500.0],
+        "Категория": ["Продукты", "Кафе", "Продукты", "Кафе", "Продукты"],
+        "Описание": ["Магнит", "Шоколадница", "Пятёрочка", "Шоколадница", "Магнит"],
+        "Сумма операции с округлением": [100.0, 200.0, 300.0, 400.0, 500.0],
+    })
+
+
+def test_build_partition_store_manifest(tmp_path, store_df):
+    manifest = build_partition_store(store_df, str(tmp_path / "store"))
+    assert [partition["name"] for partition in manifest["partitions"]] == ["2024-01", "2024-02", "2024-03", "undated"]
+    assert manifest["partitions"][0]["min_date"] == "2024-01-15T10:00:00"
+    assert manifest["partitions"][0]["max_date"] == "2024-01-31T23:00:00"
+    assert manifest["partitions"][3]["min_date"] is None
+
+
+def test_read_partition_store_projection(tmp_path, store_df):
+    store_dir = str(tmp_path / "store")
+    build_partition_store(store_df, store_dir)
+    result = read_partition_store(store_dir, columns=["Категория", "Сумма платежа"])
+    assert list(result.columns) == ["Сумма платежа", "Категория"]
+    assert len(result) == 5
+
+
+def test_read_partition_store_skips_partitions(tmp_path, store_df):
+    store_dir = str(tmp_path / "store")
+    build_partition_store(store_df, store_dir)
+    with patch("src.storage.pd.read_pickle", wraps=pd.read_pickle) as mock_read:
+        result = read_partition_store(
+            store_dir, columns=["Сумма платежа"], start_date=datetime(2024, 1, 20), end_date=datetime(2024, 2, 15)
+        )
+    assert result["Сумма платежа"].tolist() == [-200.0, -300.0]
+    assert list(result.columns) == ["Сумма платежа"]
+    # Две партиции по два столбца (сумма и дата для точной фильтрации)
+    assert mock_read.call_count == 4
+
+
+def test_read_partition_store_unknown_column(tmp_path, store_df):
+    store_dir = str(tmp_path / "store")
+    build_partition_store(store_df, store_dir)
+    with pytest.raises(ValueError):
+        read_partition_store(store_dir, columns=["Кэшбэк"])
+
+
+def test_load_operations_rebuilds_stale_store(tmp_path, store_df):
+    source = str(tmp_path / "operations.csv")
+    store_dir = str(tmp_path / "store")
+    store_df.to_csv(source, index=False)
+    assert not is_store_fresh(store_dir, source)
+
+    result = load_operations(source, store_dir, columns=["Категория"], start_date=datetime(2024, 3, 1))
+    assert result["Категория"].tolist() == ["Кафе"]
+    assert is_store_fresh(store_dir, source)
+
+    os.utime(source, (0, 0))
+    assert not is_store_fresh(store_dir, source)
+
+
+def test_store_without_base_currency_is_stale(tmp_path, store_df):
+    source = str(tmp_path / "operations.csv")
+    store_dir = str(tmp_path / "store")
+    store_df.to_csv(source, index=False)
+    manifest = build_partition_store(store_df, store_dir, source=source)
+    assert is_store_fresh(store_dir, source)
+
+    # Хранилище, построенное до пересчёта валют, перестраивается
+    del manifest["base_currency"]
+    save_manifest(store_dir, manifest)
+    assert not is_store_fresh(store_dir, source)
+
+
+def test_append_to_partition_store(tmp_path, store_df):
+    store_dir = str(tmp_path / "store")
+    build_partition_store(store_df, store_dir)
+    new_df = pd.DataFrame({
+        "Дата операции": ["20.03.2024 12:00:00", "02.04.2024 08:00:00"],
+        "Номер карты": ["*1111", "*1111"],
+        "Сумма платежа": [-600.0, -700.0],
+        "Категория": ["Продукты", "Продукты"],
+        "Описание": ["Магнит у дома", "Магнит"],
+        "Сумма операции с округлением": [600.0, 700.0],
+    })
+    manifest = append_to_partition_store(new_df, store_dir)
+
+    assert [partition["rows"] for partition in manifest["partitions"]] == [2, 1, 2, 1, 1]
+    result = read_partition_store(store_dir, columns=["Сумма платежа"], start_date=datetime(2024, 3, 1))
+    assert result["Сумма платежа"].tolist() == [-400.0, -600.0, -700.0]
+    assert len(load_search_index(store_dir).search("магнит")) == 4
+    assert card_summary_from_store(store_dir, start_date=datetime(2024, 3, 1))[0]["total_spent"] == 1300.0
+
+
+def test_card_summary_from_store(tmp_path, store_df):
+    store_dir = str(tmp_path / "store")
+    build_partition_store(store_df, store_dir)
+    assert card_summary_from_store(store_dir) == [
+        {"last_digits": "1111", "total_spent": 900.0, "cashback": 9.0},
+        {"last_digits": "2222", "total_spent": 600.0, "cashback": 6.0},
+    ]
+    # Февраль берётся из готовой сводки, январь — граничная партиция, строки которой перечитываются
+    with patch("src.storage.read_partition_store", wraps=read_partition_store) as mock_read:
+        result = card_summary_from_store(store_dir, datetime(2024, 1, 20), datetime(2024, 2, 15))
+    assert mock_read.call_count == 1
+    assert result == [
+        {"last_digits": "1111", "total_spent": 300.0, "cashback": 3.0},
+        {"last_digits": "2222", "total_spent": 200.0, "cashback": 2.0},
+    ]
+
+
+def test_build_partition_store_refuses_foreign_directory(tmp_path, store_df):
+    source = tmp_path / "operations.csv"
+    store_df.to_csv(source, index=False)
+    with pytest.raises(ValueError):
+        load_operations(str(source), str(tmp_path))
+    assert source.exists()
+
+
+def test_build_partition_store_replaces_only_own_files(tmp_path, store_df):
+    store_dir = tmp_path / "store"
+    build_partition_store(store_df, str(store_dir))
+    (store_dir / "notes.txt").write_text("не часть хранилища", encoding="utf-8")
+
+    manifest = build_partition_store(store_df.iloc[:2], str(store_dir))
+    assert [partition["name"] for partition in manifest["partitions"]] == ["2024-01"]
+    assert sorted(os.listdir(store_dir / "partitions")) == ["2024-01"]
+    assert (store_dir / "notes.txt").exists()
+    assert not os.path.exists(f"{store_dir}.tmp")
+    assert len(read_partition_store(str(store_dir))) == 2
+
+
+def test_card_summary_after_append_keeps_card_codes(tmp_path):
+    store_dir = str(tmp_path / "store")
+    columns = ["Дата операции", "Номер карты", "Сумма платежа", "Сумма операции с округлением"]
+    build_partition_store(pd.DataFrame([
+        ["10.01.2024 10:00:00", "*5555", -100.0, 100.0],
+        ["11.01.2024 10:00:00", "*7777", -200.0, 200.0],
+    ], columns=columns), store_dir)
+    # Новая карта при сортировке оказывается перед уже известными
+    new_df = pd.DataFrame([["12.02.2024 10:00:00", "*1111", -50.0, 50.0]], columns=columns)
+    append_to_partition_store(new_df, store_dir)
+
+    assert {card["last_digits"]: card["total_spent"] for card in card_summary_from_store(store_dir)} == {
+        "1111": 50.0, "5555": 100.0, "7777": 200.0,
+    }
@@ -1,10 +1,12 @@
 import json
+import os
 from datetime import datetime
 from unittest.mock import mock_open, patch
 
 import pandas as pd
 import pytest
 
+from src.currency import CURRENCY_SOURCE_COLUMNS
 from src.utils import (
     actual_currencies,
     actual_stocks,
@@ -12,6 +14,7 @@ from src.utils import (
     get_slice_of_data,
     get_summary_card_data,
     get_time_for_greeting,
+    read_converted_operations,
     read_data_file,
     top_5_transactions_by_sum,
 )
@@ -23,12 +26,49 @@ def test_get_date_range_success(test_date):
 
 
 def test_read_data_file_empty():
-    with patch("pandas.read_excel", return_value=pd.DataFrame()):
+    with patch("src.utils.read_operations", return_value=pd.DataFrame()):
         result = read_data_file()
         assert isinstance(result, pd.DataFrame)
         assert result.empty
 
 
+def test_read_data_file_projection_and_date_range(sample_dataframe):
+    with patch("src.utils.read_operations", return_value=sample_dataframe.drop(columns=["Категория"])) as mock_read:
+        result = read_data_file(
+            columns=["Сумма платежа"], start_date=datetime(2025, 2, 1), end_date=datetime(2025, 2, 15)
+        )
+        # Суммы пересчитываются в базовую валюту, поэтому дочитываются столбцы валют
+        assert mock_read.call_args.kwargs["columns"] == list(
+            dict.fromkeys(["Сумма платежа", "Дата операции"] + CURRENCY_SOURCE_COLUMNS)
+        )
+        assert list(result.columns) == ["Сумма платежа", "Дата операции"]
+        assert result["Сумма платежа"].tolist() == [-1500.0, -500.0]
+
+
+def test_read_converted_operations_converts_once(tmp_path, sample_dataframe):
+    source = tmp_path / "operations.csv"
+    source.write_text("", encoding="utf-8")
+    with patch("src.utils.read_operations", return_value=sample_dataframe) as mock_read, \
+         patch("src.utils.convert_operations", side_effect=lambda df: df) as mock_convert:
+        first = read_converted_operations(str(source), columns=["Категория"])
+        first.loc[0, "Категория"] = "Изменено"
+        second = read_converted_operations(str(source), columns=["Категория"])
+        assert mock_convert.call_count == 1
+        assert second["Категория"].tolist() == sample_dataframe["Категория"].tolist()
+
+        os.utime(source, (0, 0))
+        read_converted_operations(str(source), columns=["Категория"])
+        assert mock_read.call_count == 2
+        assert mock_convert.call_count == 2
+
+
+def test_read_data_file_uses_partition_store(tmp_path, sample_dataframe):
+    with patch.dict("os.environ", {"OPERATIONS_CACHE_DIR": str(tmp_path)}):
+        with patch("src.utils.load_operations", return_value=sample_dataframe) as mock_load:
+            read_data_file(columns=["Категория"])
+            assert mock_load.call_args.args[1:3] == (str(tmp_path), ["Категория"])
+
+
 def test_get_slice_of_data_success(sample_dataframe):
     with patch("src.utils.read_data_file", return_value=sample_dataframe):
         result = get_slice_of_data(datetime(2025, 1, 1), datetime(2025, 1, 31))
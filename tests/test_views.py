@@ -1,4 +1,8 @@
 import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pandas as pd
 import pytest
 
 from src.views import main_info
@@ -12,12 +16,14 @@ def test_main_info_success(valid_date_str, mock_dependencies):
     assert "greeting" in result
     assert "cards" in result
     assert "top_transactions" in result
+    assert "anomalies" in result
     assert "currency_rates" in result
     assert "stock_prices" in result
 
     assert result["greeting"] == "Добрый день!"
     assert isinstance(result["cards"], list)
     assert isinstance(result["top_transactions"], list)
+    assert isinstance(result["anomalies"], list)
     assert isinstance(result["currency_rates"], list)
     assert isinstance(result["stock_prices"], list)
 
@@ -26,4 +32,21 @@ def test_main_info_invalid_date_format():
     """Тест ошибки при неверном формате даты"""
     invalid_date_str = "01-05-2025 12:00:00"
     with pytest.raises(ValueError, match="Ожидаемый формат даты: 'YYYY-MM-DD HH:MM:SS'"):
-        main_info(invalid_date_str)
\ No newline at end of file
+        main_info(invalid_date_str)
+
+
+def test_main_info_anomalies_use_history():
+    history_df = pd.DataFrame({"Дата операции": pd.to_datetime(["2025-03-10 10:00:00", "2025-05-02 10:00:00"])})
+    with patch("src.views.get_slice_of_data", return_value=history_df) as mock_slice, \
+         patch("src.views.get_summary_card_data", return_value=[]) as mock_summary, \
+         patch("src.views.top_5_transactions_by_sum", return_value=[]), \
+         patch("src.views.detect_anomalies", return_value=[]) as mock_anomalies, \
+         patch("src.views.actual_currencies", return_value=[]), \
+         patch("src.views.actual_stocks", return_value=[]):
+        main_info("2025-05-15 12:00:00")
+
+    assert mock_slice.call_args.args[0] == datetime(2025, 1, 31)
+    # Карточки считаются только по периоду, поиск аномалий получает всю выборку с историей
+    assert len(mock_summary.call_args.args[0]) == 1
+    assert mock_anomalies.call_args.args[0] is history_df
+    assert mock_anomalies.call_args.kwargs["since"] == datetime(2025, 5, 1)